@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import sys
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import gspread
 from google.auth import default
 
@@ -73,8 +74,12 @@ if st.button("🚀 Calculate Commissions", type="primary"):
     # ============================================================
     
     with st.spinner("📡 Pulling data from QuickBooks and BigTime..."):
-        df_qb_raw = quickbooks.get_consulting_income(year)
-        df_bt_raw = bigtime.get_time_report(year)
+        # The two APIs are independent - pull them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            qb_future = executor.submit(quickbooks.get_consulting_income, year)
+            bt_future = executor.submit(bigtime.get_time_report, year)
+            df_qb_raw = qb_future.result()
+            df_bt_raw = bt_future.result()
         
         # Collect QB debug info
         if df_qb_raw is None:
@@ -662,13 +662,11 @@ if st.sidebar.button("Generate Report", type="primary"):
             # Add year-month column for grouping
             df['YearMonth'] = df['Date'].dt.to_period('M')
             
-            # Group by staff and month
-            pivot = df.pivot_table(
-                index='Staff Member',
-                columns='YearMonth',
-                values=value_column,
-                aggfunc='sum',
-                fill_value=0
+            # Group by staff and month (groupby + unstack; same frame as pivot_table, less overhead)
+            pivot = (
+                df.groupby(['Staff Member', 'YearMonth'])[value_column]
+                .sum()
+                .unstack('YearMonth', fill_value=0)
             )
             
             # Calculate totals
@@ -97,8 +97,9 @@ if st.button("🚀 Generate Payroll Report", type="primary"):
         # Handle year boundary - if start and end dates are in different years, pull both
         if start_date.year != end_date.year:
             # Year boundary - need to pull both years and combine
-            bt_start_year = bigtime.get_time_report(start_date.year)
-            bt_end_year = bigtime.get_time_report(end_date.year)
+            bt_years = bigtime.get_time_reports([start_date.year, end_date.year])
+            bt_start_year = bt_years[start_date.year]
+            bt_end_year = bt_years[end_date.year]
             
             if bt_start_year is not None and not bt_start_year.empty:
                 if bt_end_year is not None and not bt_end_year.empty:
@@ -232,22 +232,10 @@ Currently showing only months that have data columns.
             st.warning("⚠️ No forecast data found for selected period")
             st.stop()
         
-        # Pivot data by staff and month
-        pivot_hours = forecast_df.pivot_table(
-            index=['Staff', 'Classification'],
-            columns='Month',
-            values='Hours',
-            aggfunc='sum',
-            fill_value=0
-        )
-        
-        pivot_revenue = forecast_df.pivot_table(
-            index=['Staff', 'Classification'],
-            columns='Month',
-            values='Revenue',
-            aggfunc='sum',
-            fill_value=0
-        )
+        # Pivot data by staff and month (one groupby for both metrics, then unstack each)
+        monthly = forecast_df.groupby(['Staff', 'Classification', 'Month'])[['Hours', 'Revenue']].sum()
+        pivot_hours = monthly['Hours'].unstack('Month', fill_value=0)
+        pivot_revenue = monthly['Revenue'].unstack('Month', fill_value=0)
         
         # Add totals
         pivot_hours['Total'] = pivot_hours.sum(axis=1)
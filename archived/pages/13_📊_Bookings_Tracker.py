@@ -3,7 +3,10 @@ import pandas as pd
 import sys
 from datetime import datetime, timedelta
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Authentication check
 if 'authenticated' not in st.session_state or not st.session_state.authenticated:
@@ -27,71 +30,251 @@ def get_pipedrive_api_token():
         st.error("❌ PIPEDRIVE_API_TOKEN not found in secrets. Please add it to continue.")
         st.stop()
 
-def fetch_won_deals(start_date, end_date):
-    """Fetch won deals from Pipedrive within date range"""
-    api_token = get_pipedrive_api_token()
-    base_url = "https://api.pipedrive.com/v1"
+PIPEDRIVE_BASE_URL = "https://api.pipedrive.com/v1"
+PIPEDRIVE_V2_URL = "https://api.pipedrive.com/api/v2"
+PAGE_SIZE = 500
+PAGE_WORKERS = 4
+
+# bookings_df column for each custom field found by get_custom_field_keys
+CUSTOM_COLUMNS = {
+    'Project_Duration_Months': 'project_duration',
+    'BigTime_Client_ID': 'bigtime_client_id',
+    'BigTime_Project_ID': 'bigtime_project_id',
+    'Bill_Rate': 'bill_rate',
+    'Budget_Hours': 'budget_hours',
+    'Project_Start_Date': 'project_start_date'
+}
+
+# pandas period frequency for each "View By" option
+PERIOD_FREQS = {'Month': 'M', 'Quarter': 'Q', 'Year': 'Y'}
+
+# Pipedrive rate-limits per token (~40 requests / 2s); back off on 429 and 5xx,
+# honoring Retry-After, instead of failing the whole report on one throttled page
+_RETRY = Retry(
+    total=6,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# Shared session so paging through deals reuses one keep-alive connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_RETRY))
+
+def _auth_headers(api_token):
+    """Pipedrive accepts the API token as a header instead of a query param"""
+    return {'x-api-token': api_token}
+
+class PipedriveAPIError(RuntimeError):
+    """Non-200 or unsuccessful Pipedrive response"""
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _get_page(url, api_token, params=None, timeout=30):
+    """GET one Pipedrive page and return the decoded body"""
+    response = _SESSION.get(url, params=params, headers=_auth_headers(api_token), timeout=timeout)
+    
+    if response.status_code != 200:
+        raise PipedriveAPIError(f"Pipedrive API error: {response.status_code}", response.status_code)
+    
+    data = response.json()
+    
+    if not data.get('success'):
+        raise PipedriveAPIError(f"Pipedrive API returned error: {data.get('error', 'Unknown')}")
+    
+    return data
+
+def _fetch_org_names_v2(api_token, org_ids):
+    """Look up organization names for the given IDs (v2 deals only carry the numeric org_id)"""
+    org_ids = sorted(org_ids)
+    id_batches = [org_ids[i:i + 100] for i in range(0, len(org_ids), 100)]
+    
+    def fetch_batch(batch):
+        params = {'ids': ','.join(str(org_id) for org_id in batch), 'limit': 100}
+        return _get_page(f"{PIPEDRIVE_V2_URL}/organizations", api_token, params)
+    
+    org_names = {}
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        for data in executor.map(fetch_batch, id_batches):
+            for org in data.get('data') or []:
+                org_names[org['id']] = org.get('name', 'Unknown')
+    
+    return org_names
+
+def _deal_to_v1(deal, org_names):
+    """Reshape a v2 deal into the v1 layout the report reads (nested org, top-level custom fields)"""
+    flat = dict(deal)
+    
+    for key, value in (deal.get('custom_fields') or {}).items():
+        # Monetary custom fields come back as {"value": ..., "currency": ...}
+        flat[key] = value.get('value') if isinstance(value, dict) else value
     
-    # Get all won deals (status = won)
-    url = f"{base_url}/deals"
+    org_id = deal.get('org_id')
+    flat['org_id'] = {'value': org_id, 'name': org_names.get(org_id, 'Unknown')} if org_id else None
+    
+    # v2 returns RFC 3339 ("2024-12-15T14:30:45Z"); v1 used "2024-12-15 14:30:45"
+    won_time = deal.get('won_time')
+    if won_time:
+        flat['won_time'] = won_time.replace('T', ' ')[:19]
+    
+    return flat
+
+def _fetch_won_deals_v2(api_token, start_date):
+    """Cursor-page won deals via the v2 API, narrowed server-side to deals updated since start_date"""
     params = {
-        'api_token': api_token,
         'status': 'won',
-        'start': 0,
-        'limit': 500  # Adjust if you have more than 500 won deals
+        # v2 can't filter on won_time, but a deal won on/after start_date was
+        # necessarily updated on/after it, so this trims history without losing deals
+        'updated_since': f"{start_date.isoformat()}T00:00:00Z",
+        'limit': PAGE_SIZE
     }
     
+    deals = []
+    
+    while True:
+        data = _get_page(f"{PIPEDRIVE_V2_URL}/deals", api_token, params)
+        deals.extend(data.get('data') or [])
+        
+        next_cursor = (data.get('additional_data') or {}).get('next_cursor')
+        if not next_cursor:
+            break
+        
+        params['cursor'] = next_cursor
+    
+    org_names = _fetch_org_names_v2(api_token, {deal['org_id'] for deal in deals if deal.get('org_id')})
+    
+    return [_deal_to_v1(deal, org_names) for deal in deals]
+
+def _fetch_v1_page(api_token, start):
+    """Fetch one offset page of won deals from the v1 API, newest won first"""
+    params = {
+        'status': 'won',
+        'sort': 'won_time DESC',
+        'start': start,
+        'limit': PAGE_SIZE
+    }
+    return _get_page(f"{PIPEDRIVE_BASE_URL}/deals", api_token, params)
+
+def _more_items_start(page):
+    """Return next_start if the page says more deals follow, else None"""
+    pagination = (page.get('additional_data') or {}).get('pagination', {})
+    if pagination.get('more_items_in_collection'):
+        return pagination.get('next_start', 0)
+    return None
+
+def _reaches_before(page, start_date):
+    """True once a newest-first page contains deals won before start_date (later pages are all older)"""
+    won_times = [deal['won_time'] for deal in page.get('data') or [] if deal.get('won_time')]
+    # "YYYY-MM-DD HH:MM:SS" sorts lexicographically, so no parsing is needed
+    return bool(won_times) and min(won_times) < start_date.isoformat()
+
+def _fetch_won_deals_v1_serial(api_token, start, start_date):
+    """Walk v1 pages one at a time from the given offset until they predate start_date"""
     all_deals = []
     
+    while start is not None:
+        page = _fetch_v1_page(api_token, start)
+        deals = page.get('data') or []
+        if not deals:
+            break
+        
+        all_deals.extend(deals)
+        if _reaches_before(page, start_date):
+            break
+        
+        start = _more_items_start(page)
+    
+    return all_deals
+
+def _fetch_won_deals_v1(api_token, start_date):
+    """Page through won deals via the v1 API (fallback when v2 is unavailable)"""
+    first_page = _fetch_v1_page(api_token, 0)
+    all_deals = list(first_page.get('data') or [])
+    next_start = _more_items_start(first_page)
+    
+    if next_start is None or _reaches_before(first_page, start_date):
+        return all_deals
+    
+    # The first page only says "more"; the summary total tells us every remaining
+    # offset up front so those pages can be requested concurrently - in waves, so
+    # we can stop as soon as a wave reaches deals won before the report window
+    pages = []
+    reached_start = False
     try:
-        with st.spinner("📡 Fetching won deals from Pipedrive..."):
-            while True:
-                response = requests.get(url, params=params, timeout=30)
-                
-                if response.status_code != 200:
-                    st.error(f"❌ Pipedrive API error: {response.status_code}")
-                    return None
-                
-                data = response.json()
-                
-                if not data.get('success'):
-                    st.error(f"❌ Pipedrive API returned error: {data.get('error', 'Unknown')}")
-                    return None
-                
-                deals = data.get('data', [])
-                if not deals:
-                    break
-                
-                all_deals.extend(deals)
-                
-                # Check if there are more pages
-                additional_data = data.get('additional_data', {})
-                pagination = additional_data.get('pagination', {})
-                if not pagination.get('more_items_in_collection'):
+        summary = _get_page(f"{PIPEDRIVE_BASE_URL}/deals/summary", api_token, {'status': 'won'})
+        offsets = list(range(next_start, summary['data']['total_count'], PAGE_SIZE))
+        
+        with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+            for i in range(0, len(offsets), PAGE_WORKERS):
+                wave = list(executor.map(
+                    lambda start: _fetch_v1_page(api_token, start),
+                    offsets[i:i + PAGE_WORKERS]
+                ))
+                pages.extend(wave)
+                if any(_reaches_before(page, start_date) for page in wave):
+                    reached_start = True
                     break
-                
-                # Move to next page
-                params['start'] = pagination.get('next_start', 0)
+    except (PipedriveAPIError, KeyError, TypeError):
+        # Rate-limited or no usable total - fall back to one page at a time
+        pages = []
+    
+    # Continue serially past the estimate (deals won since the summary, or no summary at all)
+    remaining = []
+    if not reached_start:
+        tail_start = _more_items_start(pages[-1]) if pages else next_start
+        remaining = _fetch_won_deals_v1_serial(api_token, tail_start, start_date)
+    
+    # Offsets shift if deals change mid-pull, so pages can overlap
+    seen = {deal['id'] for deal in all_deals}
+    for deal in [deal for page in pages for deal in page.get('data') or []] + remaining:
+        if deal['id'] not in seen:
+            seen.add(deal['id'])
+            all_deals.append(deal)
+    
+    return all_deals
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_won_deals_raw(api_token, start_date):
+    """Pull won deals that may have closed on/after start_date (no Streamlit calls, so the result caches cleanly)"""
+    try:
+        return _fetch_won_deals_v2(api_token, start_date)
+    except PipedriveAPIError as e:
+        if e.status_code != 404:
+            raise
+    
+    return _fetch_won_deals_v1(api_token, start_date)
+
+def fetch_won_deals(start_date, end_date):
+    """Fetch won deals from Pipedrive within date range"""
+    api_token = get_pipedrive_api_token()
+    
+    try:
+        with st.spinner("📡 Fetching won deals from Pipedrive..."):
+            all_deals = _fetch_won_deals_raw(api_token, start_date)
         
         st.success(f"✅ Fetched {len(all_deals)} won deals from Pipedrive")
         
-        # Filter by close date range
-        filtered_deals = []
-        for deal in all_deals:
-            won_time = deal.get('won_time')
-            if won_time:
-                # Parse won_time (format: "2024-12-15 14:30:45")
-                try:
-                    won_date = datetime.strptime(won_time, "%Y-%m-%d %H:%M:%S").date()
-                    if start_date <= won_date <= end_date:
-                        filtered_deals.append(deal)
-                except:
-                    pass
+        # Filter by close date range (the API can only narrow by update time, not won_time)
+        # Parse every won_time (format: "2024-12-15 14:30:45") in one pass; missing or
+        # malformed values become NaT and fall out of the mask
+        won_dates = pd.to_datetime(
+            pd.Series([deal.get('won_time') for deal in all_deals], dtype=object),
+            format="%Y-%m-%d %H:%M:%S",
+            errors='coerce'
+        ).dt.normalize()
+        in_range = won_dates.between(pd.Timestamp(start_date), pd.Timestamp(end_date)).tolist()
+        filtered_deals = [deal for deal, keep in zip(all_deals, in_range) if keep]
         
         st.info(f"📅 {len(filtered_deals)} deals closed between {start_date} and {end_date}")
         
         return filtered_deals
     
+    except PipedriveAPIError as e:
+        st.error(f"❌ {e}")
+        return None
     except requests.exceptions.RequestException as e:
         st.error(f"❌ Connection error: {e}")
         return None
@@ -101,147 +284,86 @@ def fetch_won_deals(start_date, end_date):
         st.code(traceback.format_exc())
         return None
 
-def get_custom_field_keys():
-    """Fetch custom field definitions to find our field keys"""
-    api_token = get_pipedrive_api_token()
-    base_url = "https://api.pipedrive.com/v1"
-    
-    url = f"{base_url}/dealFields"
-    params = {'api_token': api_token}
-    
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                fields = data.get('data', [])
-                
-                # Build a mapping of field names to their keys
-                field_map = {}
-                for field in fields:
-                    name = field.get('name', '').lower()
-                    key = field.get('key')
-                    
-                    # Look for our custom fields
-                    if 'bigtime client id' in name:
-                        field_map['bigtime_client_id'] = key
-                    elif 'bill rate' in name:
-                        field_map['bill_rate'] = key
-                    elif 'total budget hours' in name or 'budget hours' in name:
-                        field_map['budget_hours'] = key
-                    elif 'project duration' in name or 'duration' in name:
-                        field_map['project_duration'] = key
-                    elif 'bigtime project id' in name or 'project id' in name:
-                        field_map['bigtime_project_id'] = key
-                    elif 'project start date' in name or 'start date' in name:
-                        field_map['project_start_date'] = key
-                
-                return field_map
+# Custom dealField name fragments -> our field names, most specific first.
+# Each field matches at most one target, so e.g. a generic "Start Date" field
+# no longer overwrites the Project Start Date key.
+_FIELD_PATTERNS = [
+    ('bigtime client id', 'bigtime_client_id'),
+    ('bigtime project id', 'bigtime_project_id'),
+    ('bill rate', 'bill_rate'),
+    ('budget hours', 'budget_hours'),
+    ('project duration', 'project_duration'),
+    ('project start date', 'project_start_date')
+]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_custom_field_keys(api_token):
+    """Fetch dealFields and map our custom field names to their Pipedrive keys"""
+    data = _get_page(f"{PIPEDRIVE_BASE_URL}/dealFields", api_token, timeout=10)
+    fields = data.get('data', [])
+    
+    # Build a mapping of field names to their keys
+    field_map = {}
+    for field in fields:
+        name = field.get('name', '').lower()
         
-        return {}
+        # Look for our custom fields
+        for pattern, target in _FIELD_PATTERNS:
+            if pattern in name:
+                field_map[target] = field.get('key')
+                break
     
+    return field_map
+
+def get_custom_field_keys(fields_future):
+    """Collect the custom field keys from a background _fetch_custom_field_keys call"""
+    try:
+        return fields_future.result()
     except Exception as e:
         st.warning(f"⚠️ Could not fetch custom field keys: {e}")
         return {}
 
 # ============================================================
-# DATE RANGE SELECTION
+# EXCEL EXPORT HELPERS
 # ============================================================
 
-st.subheader("Report Period")
+@st.cache_data(show_spinner=False)
+def _build_xlsx(period_summary, bookings_df, view_by):
+    """Serialize the report to XLSX bytes (cached on the frames, so reruns skip the rebuild)"""
+    output = BytesIO()
+    
+    # xlsxwriter is much faster than building openpyxl's in-memory cell tree.
+    # constant_memory stays off: pandas writes column by column, which that mode drops.
+    with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
+        # Summary sheet
+        period_summary.to_excel(writer, sheet_name=f'By_{view_by}', index=False)
+        
+        # Detailed sheet
+        bookings_df.to_excel(writer, sheet_name='All_Bookings', index=False)
+    
+    return output.getvalue()
 
-# Default: Last 12 months
-today = datetime.now().date()
-default_start = today.replace(year=today.year - 1, month=1, day=1)
-default_end = today
+# ============================================================
+# REPORT RENDERING
+# ============================================================
 
-col1, col2 = st.columns(2)
-with col1:
-    start_date = st.date_input(
-        "Start Date",
-        value=default_start,
-        help="First date to include in report"
-    )
-with col2:
-    end_date = st.date_input(
-        "End Date",
-        value=default_end,
-        help="Last date to include in report"
+@st.fragment
+def render_report(bookings_df, start_date, end_date):
+    """Render the stored report; the view selector reruns only this fragment"""
+    # View selector
+    view_by = st.radio(
+        "View By",
+        ["Month", "Quarter", "Year"],
+        horizontal=True,
+        help="Group bookings by time period"
     )
-
-# View selector
-view_by = st.radio(
-    "View By",
-    ["Month", "Quarter", "Year"],
-    horizontal=True,
-    help="Group bookings by time period"
-)
-
-if st.button("📊 Generate Report", type="primary"):
-    
-    # Fetch won deals
-    deals = fetch_won_deals(start_date, end_date)
-    
-    if not deals:
-        st.warning("No won deals found for the selected period")
-        st.stop()
     
-    # Get custom field mappings
-    custom_fields = get_custom_field_keys()
+    # Add time period grouping - a Period dtype groups on int64 ordinals and
+    # sorts chronologically; it only becomes text (2025-01, 2025Q1, 2025) for display
+    period = bookings_df['Close_Date'].dt.to_period(PERIOD_FREQS[view_by])
     
-    # Process deals into dataframe
-    bookings_data = []
-    
-    for deal in deals:
-        # Standard fields
-        org = deal.get('org_id', {})
-        client_name = org.get('name', 'Unknown') if isinstance(org, dict) else 'Unknown'
-        
-        deal_title = deal.get('title', 'Untitled')
-        deal_value = deal.get('value', 0)
-        won_time = deal.get('won_time', '')
-        
-        # Parse close date
-        try:
-            close_date = datetime.strptime(won_time, "%Y-%m-%d %H:%M:%S").date() if won_time else None
-        except:
-            close_date = None
-        
-        # Custom fields - these will be keys like '9a4d5e2b3c1f'
-        project_duration = deal.get(custom_fields.get('project_duration'), None) if 'project_duration' in custom_fields else None
-        bigtime_client_id = deal.get(custom_fields.get('bigtime_client_id'), None) if 'bigtime_client_id' in custom_fields else None
-        bigtime_project_id = deal.get(custom_fields.get('bigtime_project_id'), None) if 'bigtime_project_id' in custom_fields else None
-        bill_rate = deal.get(custom_fields.get('bill_rate'), None) if 'bill_rate' in custom_fields else None
-        budget_hours = deal.get(custom_fields.get('budget_hours'), None) if 'budget_hours' in custom_fields else None
-        project_start_date = deal.get(custom_fields.get('project_start_date'), None) if 'project_start_date' in custom_fields else None
-        
-        bookings_data.append({
-            'Client': client_name,
-            'Deal_Name': deal_title,
-            'Close_Date': close_date,
-            'Deal_Value': deal_value,
-            'Project_Duration_Months': project_duration,
-            'BigTime_Client_ID': bigtime_client_id,
-            'BigTime_Project_ID': bigtime_project_id,
-            'Bill_Rate': bill_rate,
-            'Budget_Hours': budget_hours,
-            'Project_Start_Date': project_start_date
-        })
-    
-    bookings_df = pd.DataFrame(bookings_data)
-    
-    # Add time period grouping
-    bookings_df['Close_Date'] = pd.to_datetime(bookings_df['Close_Date'])
-    
-    if view_by == "Month":
-        bookings_df['Period'] = bookings_df['Close_Date'].dt.strftime('%Y-%m')
-    elif view_by == "Quarter":
-        bookings_df['Period'] = bookings_df['Close_Date'].dt.to_period('Q').astype(str)
-    else:  # Year
-        bookings_df['Period'] = bookings_df['Close_Date'].dt.year.astype(str)
-    
-    # Sort by close date
-    bookings_df = bookings_df.sort_values('Close_Date')
+    # Sort by close date for the detailed table (assign leaves the stored frame untouched)
+    bookings_df = bookings_df.assign(Period=period).sort_values('Close_Date')
     
     # ============================================================
     # DISPLAY RESULTS
@@ -271,18 +393,14 @@ if st.button("📊 Generate Report", type="primary"):
     # Section 2: Bookings by Period
     st.subheader(f"📅 Bookings by {view_by}")
     
-    period_summary = bookings_df.groupby('Period').agg({
-        'Deal_Name': 'count',
-        'Deal_Value': 'sum',
-        'Client': 'nunique'
-    }).reset_index()
-    
-    period_summary = period_summary.rename(columns={
-        'Period': view_by,
-        'Deal_Name': 'Deal Count',
-        'Deal_Value': 'Total Value',
-        'Client': 'Unique Clients'
+    # Named aggregation labels the output columns directly (no rename pass)
+    period_summary = bookings_df.groupby('Period', observed=True, sort=True).agg(**{
+        'Deal Count': ('Deal_Name', 'count'),
+        'Total Value': ('Deal_Value', 'sum'),
+        'Unique Clients': ('Client', 'nunique')
     })
+    period_summary.index = period_summary.index.astype(str).rename(view_by)
+    period_summary = period_summary.reset_index()
     
     st.dataframe(
         period_summary.style.format({
@@ -297,14 +415,13 @@ if st.button("📊 Generate Report", type="primary"):
     # Section 3: Detailed Bookings
     st.subheader("📋 Detailed Bookings")
     
-    # Prepare display dataframe
+    # Prepare display dataframe - the column selection is already a new frame,
+    # so rename/assign chain onto it without an extra copy
     display_df = bookings_df[[
         'Period', 'Client', 'Deal_Name', 'Close_Date', 
         'Deal_Value', 'Project_Duration_Months', 
         'BigTime_Client_ID', 'BigTime_Project_ID'
-    ]].copy()
-    
-    display_df = display_df.rename(columns={
+    ]].rename(columns={
         'Period': view_by,
         'Deal_Name': 'Deal Name',
         'Close_Date': 'Close Date',
@@ -312,11 +429,12 @@ if st.button("📊 Generate Report", type="primary"):
         'Project_Duration_Months': 'Duration (Mo)',
         'BigTime_Client_ID': 'BT Client ID',
         'BigTime_Project_ID': 'BT Project ID'
+    }).assign(**{
+        # Format dates and periods
+        'Close Date': lambda d: d['Close Date'].dt.strftime('%Y-%m-%d'),
+        view_by: lambda d: d[view_by].astype(str)
     })
     
-    # Format dates
-    display_df['Close Date'] = display_df['Close Date'].dt.strftime('%Y-%m-%d')
-    
     st.dataframe(
         display_df.style.format({
             'Value': '${:,.0f}'
@@ -333,16 +451,7 @@ if st.button("📊 Generate Report", type="primary"):
     st.subheader("📥 Export Report")
     
     try:
-        output = BytesIO()
-        
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Summary sheet
-            period_summary.to_excel(writer, sheet_name=f'By_{view_by}', index=False)
-            
-            # Detailed sheet
-            bookings_df.to_excel(writer, sheet_name='All_Bookings', index=False)
-        
-        excel_data = output.getvalue()
+        excel_data = _build_xlsx(period_summary, bookings_df.assign(Period=bookings_df['Period'].astype(str)), view_by)
         filename = f"bookings_report_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.xlsx"
         
         st.download_button(
@@ -358,6 +467,88 @@ if st.button("📊 Generate Report", type="primary"):
         import traceback
         st.code(traceback.format_exc())
 
+# ============================================================
+# DATE RANGE SELECTION
+# ============================================================
+
+st.subheader("Report Period")
+
+# Default: Last 12 months
+today = datetime.now().date()
+default_start = today.replace(year=today.year - 1, month=1, day=1)
+default_end = today
+
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input(
+        "Start Date",
+        value=default_start,
+        help="First date to include in report"
+    )
+with col2:
+    end_date = st.date_input(
+        "End Date",
+        value=default_end,
+        help="Last date to include in report"
+    )
+
+if st.button("📊 Generate Report", type="primary"):
+    
+    # Custom field mappings don't depend on the deals, so fetch them in the
+    # background while the won deals page in
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        fields_future = executor.submit(_fetch_custom_field_keys, get_pipedrive_api_token())
+        
+        # Fetch won deals
+        deals = fetch_won_deals(start_date, end_date)
+        custom_fields = get_custom_field_keys(fields_future)
+    
+    if not deals:
+        st.session_state.pop('bookings_report', None)
+        st.warning("No won deals found for the selected period")
+        st.stop()
+    
+    # Process deals into dataframe - flatten once instead of walking each deal
+    # (nested org_id becomes an 'org_id.name' column)
+    deals_df = pd.json_normalize(deals, max_level=1)
+    
+    def deal_column(key, default=None):
+        """Column from the flattened deals, or a constant when the field is absent"""
+        if key and key in deals_df.columns:
+            return deals_df[key]
+        return pd.Series(default, index=deals_df.index, dtype=object)
+    
+    bookings_df = pd.DataFrame({
+        'Client': deal_column('org_id.name', 'Unknown').fillna('Unknown'),
+        'Deal_Name': deal_column('title', 'Untitled').fillna('Untitled'),
+        'Close_Date': pd.to_datetime(deal_column('won_time'), format="%Y-%m-%d %H:%M:%S", errors='coerce').dt.normalize(),
+        'Deal_Value': deal_column('value', 0),
+        # Custom fields - these will be keys like '9a4d5e2b3c1f', bound once per column
+        **{column: deal_column(custom_fields.get(field)) for column, field in CUSTOM_COLUMNS.items()}
+    })
+    
+    # Give numeric columns real dtypes so Arrow doesn't convert object cells one by one.
+    # Dollar amounts and hours stay float64 for exact totals; whole-month durations
+    # fit float32. BigTime IDs are left alone (missing values would turn them into floats).
+    for column in ['Deal_Value', 'Bill_Rate', 'Budget_Hours']:
+        bookings_df[column] = pd.to_numeric(bookings_df[column], errors='coerce')
+    bookings_df['Project_Duration_Months'] = pd.to_numeric(
+        bookings_df['Project_Duration_Months'], errors='coerce', downcast='float'
+    )
+    bookings_df['Client'] = bookings_df['Client'].astype('category')
+    
+    # Keep the report across reruns so switching the view (or any other widget)
+    # regroups the stored frame instead of refetching Pipedrive
+    st.session_state['bookings_report'] = {
+        'range': (start_date, end_date),
+        'bookings_df': bookings_df
+    }
+
+report = st.session_state.get('bookings_report')
+
+if report and report['range'] == (start_date, end_date):
+    render_report(report['bookings_df'], start_date, end_date)
+
 else:
     st.info("👆 Select date range and click the button to generate report")
     
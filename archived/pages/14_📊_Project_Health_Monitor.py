@@ -273,8 +273,7 @@ if st.button("📊 Generate Project Health Report", type="primary"):
         years_to_fetch = [current_year - 1, current_year]
         
         bt_time_list = []
-        for year in years_to_fetch:
-            bt_year = bigtime.get_time_report(year)
+        for bt_year in bigtime.get_time_reports(years_to_fetch).values():
             if bt_year is not None and not bt_year.empty:
                 bt_time_list.append(bt_year)
         
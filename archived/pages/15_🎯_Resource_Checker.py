@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from io import BytesIO
@@ -10,8 +12,9 @@ if 'authenticated' not in st.session_state or not st.session_state.authenticated
     st.error("🔐 Please log in through the Home page")
     st.stop()
 
-# Add functions to path
-sys.path.append('./functions')
+# Add functions to path (once - the script reruns on every interaction)
+if './functions' not in sys.path:
+    sys.path.append('./functions')
 
 import bigtime
 import sheets
@@ -21,71 +24,110 @@ st.set_page_config(page_title="Resource Checker", page_icon="🎯", layout="wide
 st.title("🎯 Resource Checker")
 st.markdown("Monitor utilization adherence, revenue underruns, and schedule pace")
 
-# Config from secrets
-try:
-    CONFIG_SHEET_ID = st.secrets["SHEET_CONFIG_ID"]
-except:
-    import credentials
-    CONFIG_SHEET_ID = credentials.get("SHEET_CONFIG_ID")
-
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+@st.cache_resource
+def get_config_sheet_id():
+    """Config spreadsheet ID from secrets, falling back to credentials.py"""
+    try:
+        return st.secrets["SHEET_CONFIG_ID"]
+    except:
+        import credentials
+        return credentials.get("SHEET_CONFIG_ID")
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_time_report(year):
+    """BigTime time report for one year, cached per year (empty for a year with no entries)"""
+    # A failed fetch raises, so st.cache_data stores nothing and the year is retried next run
+    return bigtime.get_time_report(year, raise_on_error=True)
+
+def fetch_time_report(year):
+    """load_time_report for a worker thread - None when the fetch failed"""
+    try:
+        return load_time_report(year)
+    except Exception:
+        return None
+
+# Column order of the resource check results (and its Excel export)
+RESULT_COLUMNS = [
+    'Staff_Member', 'Client', 'Project_Name', 'Project_ID',
+    'Total_Assigned', 'Total_Actual', 'Percent_Used',
+    'Utilization_Status', 'Utilization_Color', 'Sort_Order',
+    'Schedule_Status', 'Pace_Ratio', 'Expected_Hours', 'Delta',
+    'Is_Unassigned', 'First_Month', 'Last_Month'
+]
+
+def first_present(columns, candidates):
+    """First candidate column name found in a set of columns, or None"""
+    return next((col for col in candidates if col in columns), None)
+
 def normalize_project_id(pid):
     """Normalize project ID to string for matching"""
     if pd.isna(pid):
         return None
     return str(pid).strip()
 
-def get_utilization_status(percent_used):
-    """Determine utilization status based on percent used"""
-    if percent_used >= 100:
-        return {'status': 'Overrun', 'color': '🔴', 'sort_order': 1}
-    elif percent_used >= 95:
-        return {'status': 'On Target', 'color': '🟢', 'sort_order': 5}
-    elif percent_used >= 85:
-        return {'status': 'At Risk (High)', 'color': '🟡', 'sort_order': 3}
-    elif percent_used >= 70:
-        return {'status': 'Under Target', 'color': '🔵', 'sort_order': 4}
-    else:
-        return {'status': 'Severely Under', 'color': '🟣', 'sort_order': 2}
+def normalize_project_ids(ids):
+    """normalize_project_id over a Series, computed once per distinct ID"""
+    return ids.map({pid: normalize_project_id(pid) for pid in ids.unique()})
 
-def get_schedule_status(pace_ratio):
-    """Determine schedule status based on pace ratio"""
-    if pace_ratio >= 1.05:
-        return 'Ahead'
-    elif pace_ratio >= 0.95:
-        return 'On Schedule'
-    elif pace_ratio >= 0.85:
-        return 'At Risk (Late)'
-    else:
-        return 'Late'
+# Utilization bands, highest threshold first: (min percent used, status, color, sort order)
+UTILIZATION_BANDS = [
+    (100, 'Overrun', '🔴', 1),
+    (95, 'On Target', '🟢', 5),
+    (85, 'At Risk (High)', '🟡', 3),
+    (70, 'Under Target', '🔵', 4)
+]
+UTILIZATION_DEFAULT = ('Severely Under', '🟣', 2)
 
-# ============================================================
-# DATE RANGE SELECTION
-# ============================================================
+# Schedule bands, highest threshold first: (min pace ratio, status)
+SCHEDULE_BANDS = [
+    (1.05, 'Ahead'),
+    (0.95, 'On Schedule'),
+    (0.85, 'At Risk (Late)')
+]
+SCHEDULE_DEFAULT = 'Late'
 
-st.subheader("Analysis Period")
+def utilization_status_vec(percent_used):
+    """Utilization status, color and sort order for a Series of percent-used values"""
+    conditions = [percent_used >= threshold for threshold, _, _, _ in UTILIZATION_BANDS]
+    default_status, default_color, default_sort = UTILIZATION_DEFAULT
+    return pd.DataFrame({
+        'status': np.select(conditions, [band[1] for band in UTILIZATION_BANDS], default=default_status),
+        'color': np.select(conditions, [band[2] for band in UTILIZATION_BANDS], default=default_color),
+        'sort_order': np.select(conditions, [band[3] for band in UTILIZATION_BANDS], default=default_sort)
+    }, index=percent_used.index)
 
-today = date.today()
-default_start = date(today.year, 1, 1)
-default_end = date(today.year, 12, 31)
+def schedule_status_vec(pace_ratio):
+    """Schedule status for a Series of pace ratios"""
+    conditions = [pace_ratio >= threshold for threshold, _ in SCHEDULE_BANDS]
+    statuses = [status for _, status in SCHEDULE_BANDS]
+    return pd.Series(np.select(conditions, statuses, default=SCHEDULE_DEFAULT), index=pace_ratio.index)
 
-col1, col2 = st.columns(2)
-with col1:
-    start_date = st.date_input("Start Date", value=default_start)
-with col2:
-    end_date = st.date_input("End Date", value=default_end)
+# ============================================================
+# RESOURCE CHECK PIPELINE
+# ============================================================
 
-if st.button("🎯 Run Resource Check", type="primary"):
-    
+def run_resource_check(start_date, end_date):
+    """Phases 1-5 for an analysis period; returns (results_df, planned hours by month)"""
+    results_df, plan_export, complete = _run_resource_check(start_date, end_date)
+    if not complete:
+        # Built without some years' actuals - drop it so the next run fetches them again
+        _run_resource_check.clear()
+    return results_df, plan_export
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def _run_resource_check(start_date, end_date):
+    """Cached resource check; returns (results_df, plan_export, complete) - complete is False when a year failed to load"""
     # ============================================================
     # PHASE 1: LOAD ASSIGNMENTS DATA
     # ============================================================
     
     with st.spinner("📡 Loading assignments from Google Sheets..."):
-        assignments_df = sheets.read_config(CONFIG_SHEET_ID, "Assignments")
+        # read_config caches per data source itself (and never caches a failed read)
+        assignments_df = sheets.read_config(get_config_sheet_id(), "Assignments")
         
         if assignments_df is None or assignments_df.empty:
             st.error("❌ Could not load Assignments data")
@@ -105,80 +147,68 @@ if st.button("🎯 Run Resource Check", type="primary"):
         # Get all years in the date range
         years_needed = list(range(start_date.year, end_date.year + 1))
         bt_time_list = []
+        missing_years = []
+        
+        # Years are independent requests, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(years_needed))) as executor:
+            for year, bt_year in zip(years_needed, executor.map(fetch_time_report, years_needed)):
+                if bt_year is None:
+                    missing_years.append(year)
+                elif not bt_year.empty:
+                    bt_time_list.append(bt_year)
         
-        for year in years_needed:
-            bt_year = bigtime.get_time_report(year)
-            if bt_year is not None and not bt_year.empty:
-                bt_time_list.append(bt_year)
+        if missing_years and bt_time_list:
+            st.warning(f"⚠️ Could not load BigTime data for {', '.join(map(str, missing_years))} - actuals for those years are missing")
         
         if not bt_time_list:
             st.error("❌ No BigTime data available")
             st.stop()
         
-        bt_time = pd.concat(bt_time_list, ignore_index=True)
-        
-        # Filter out Internal projects (BigTime Client ID = 5556066)
-        client_id_col = None
-        for col in ['tmclientnm_id', 'Client_ID', 'exclientnm_id']:
-            if col in bt_time.columns:
-                client_id_col = col
-                break
+        # Find columns (every year's report has the same layout)
+        bt_columns = set().union(*(bt_year.columns for bt_year in bt_time_list))
         
-        if client_id_col:
-            bt_time = bt_time[bt_time[client_id_col] != 5556066].copy()
-            st.info(f"🔍 Filtered out Internal projects (Client ID 5556066)")
+        client_id_col = first_present(bt_columns, ['tmclientnm_id', 'Client_ID', 'exclientnm_id'])
+        date_col = first_present(bt_columns, ['Date', 'tmdt'])
+        staff_col = first_present(bt_columns, ['Staff Member', 'tmstaffnm'])
+        project_id_col = first_present(bt_columns, ['tmprojectnm_id', 'Project_ID'])
+        hours_col = first_present(bt_columns, ['tmhrsin', 'Hours'])
         
-        # Find columns
-        date_col = None
-        for col in ['Date', 'tmdt']:
-            if col in bt_time.columns:
-                date_col = col
-                break
-        
-        staff_col = None
-        for col in ['Staff Member', 'tmstaffnm']:
-            if col in bt_time.columns:
-                staff_col = col
-                break
-        
-        project_id_col = None
-        for col in ['tmprojectnm_id', 'Project_ID']:
-            if col in bt_time.columns:
-                project_id_col = col
-                break
-        
-        hours_col = None
-        for col in ['tmhrsin', 'Hours']:
-            if col in bt_time.columns:
-                hours_col = col
-                break
+        # Also extract project and client names for unassigned work detection
+        project_col = first_present(bt_columns, ['Project', 'tmprojectnm', 'exprojectnm'])
+        client_col = first_present(bt_columns, ['Client', 'tmclientnm', 'exclientnm'])
         
         if not all([date_col, staff_col, project_id_col, hours_col]):
-            st.error(f"❌ Missing required columns. Found: {bt_time.columns.tolist()}")
+            st.error(f"❌ Missing required columns. Found: {sorted(bt_columns)}")
             st.stop()
         
-        # Filter and normalize
-        bt_time['Date'] = pd.to_datetime(bt_time[date_col])
-        bt_time = bt_time[
-            (bt_time['Date'] >= pd.Timestamp(start_date)) & 
-            (bt_time['Date'] <= pd.Timestamp(end_date))
-        ].copy()
+        # Filter each year to the date range (and out of Internal projects, BigTime
+        # Client ID = 5556066) before concatenating, keeping only the columns we use
+        keep_cols = [col for col in dict.fromkeys([client_id_col, date_col, staff_col, project_id_col, hours_col, project_col, client_col]) if col]
+        range_start, range_end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        
+        for i, bt_year in enumerate(bt_time_list):
+            bt_year = bt_year.reindex(columns=keep_cols)
+            dates = pd.to_datetime(bt_year[date_col])
+            in_range = (dates >= range_start) & (dates <= range_end)
+            if client_id_col:
+                in_range &= bt_year[client_id_col] != 5556066
+            bt_time_list[i] = bt_year[in_range].assign(Date=dates[in_range])
+        
+        bt_time = pd.concat(bt_time_list, ignore_index=True)
+        
+        if client_id_col:
+            st.info(f"🔍 Filtered out Internal projects (Client ID 5556066)")
         
+        # Normalize
         bt_time['Staff_Member'] = bt_time[staff_col]
-        bt_time['Project_ID'] = bt_time[project_id_col].apply(normalize_project_id)
+        bt_time['Project_ID'] = normalize_project_ids(bt_time[project_id_col])
         bt_time['Hours'] = pd.to_numeric(bt_time[hours_col], errors='coerce').fillna(0)
         bt_time['Month'] = bt_time['Date'].dt.to_period('M')
         
-        # Also extract project and client names for unassigned work detection
-        for col in ['Project', 'tmprojectnm', 'exprojectnm']:
-            if col in bt_time.columns:
-                bt_time['Project'] = bt_time[col]
-                break
-        
-        for col in ['Client', 'tmclientnm', 'exclientnm']:
-            if col in bt_time.columns:
-                bt_time['Client'] = bt_time[col]
-                break
+        if project_col:
+            bt_time['Project'] = bt_time[project_col]
+        if client_col:
+            bt_time['Client'] = bt_time[client_col]
         
         st.success(f"✅ Loaded {len(bt_time)} BigTime entries")
     
@@ -190,21 +220,19 @@ if st.button("🎯 Run Resource Check", type="primary"):
         # Identify month columns in assignments sheet
         standard_cols = ['Client', 'Project Name', 'Project ID', 'Staff Member', 'Bill Rate', 'Project Status', 'Total']
         
+        # Parse every header as a date in one call; non-date headers come back NaT
+        header_dates = pd.to_datetime(pd.Index(assignments_df.columns, dtype=object), errors='coerce', format='mixed')
+        
         month_cols = []
-        for col in assignments_df.columns:
-            if col not in standard_cols:
-                try:
-                    # Try to parse as date
-                    col_date = pd.to_datetime(col)
-                    month_cols.append({
-                        'column': col,
-                        'date': col_date,
-                        'period': col_date.to_period('M'),
-                        'year': col_date.year,
-                        'month': col_date.month
-                    })
-                except:
-                    pass
+        for col, col_date in zip(assignments_df.columns, header_dates):
+            if col not in standard_cols and pd.notna(col_date):
+                month_cols.append({
+                    'column': col,
+                    'date': col_date,
+                    'period': col_date.to_period('M'),
+                    'year': col_date.year,
+                    'month': col_date.month
+                })
         
         month_cols = sorted(month_cols, key=lambda x: x['date'])
         
@@ -218,49 +246,41 @@ if st.button("🎯 Run Resource Check", type="primary"):
             else:
                 m['type'] = 'Plan'
         
-        # Build resource-project records
-        resources = []
-        
-        for _, row in assignments_df.iterrows():
-            staff = row.get('Staff Member')
-            client = row.get('Client')
-            project_name = row.get('Project Name')
-            project_id = normalize_project_id(row.get('Project ID'))
-            total_assigned = pd.to_numeric(row.get('Total', 0), errors='coerce')
-            
-            if pd.isna(staff) or not staff or pd.isna(total_assigned):
-                continue
-            
-            # Skip Internal projects (admin, travel, team meetings, etc.)
-            if isinstance(project_name, str) and project_name.lower().startswith('internal:'):
-                continue
-            
-            # Get planned hours by month
-            monthly_plan = {}
-            first_month = None
-            last_month = None
-            
-            for m in month_cols:
-                hours = pd.to_numeric(row.get(m['column'], 0), errors='coerce')
-                if pd.isna(hours):
-                    hours = 0
-                
-                if hours > 0:
-                    monthly_plan[m['period']] = hours
-                    if first_month is None:
-                        first_month = m['period']
-                    last_month = m['period']
-            
-            resources.append({
-                'Staff_Member': staff,
-                'Client': client,
-                'Project_Name': project_name,
-                'Project_ID': project_id,
-                'Total_Assigned': total_assigned,
-                'Monthly_Plan': monthly_plan,
-                'First_Month': first_month,
-                'Last_Month': last_month
-            })
+        # Build resource-project records - one per usable assignment row
+        rows = assignments_df.reindex(columns=['Staff Member', 'Client', 'Project Name', 'Project ID']).astype(object)
+        if 'Total' in assignments_df.columns:
+            totals = pd.to_numeric(assignments_df['Total'], errors='coerce')
+        else:
+            totals = pd.Series(0, index=assignments_df.index)
+        
+        # Skip rows without a staff member or a numeric total, and Internal projects
+        # (admin, travel, team meetings, etc.)
+        is_internal = rows['Project Name'].str.lower().str.startswith('internal:', na=False)
+        keep = rows['Staff Member'].notna() & (rows['Staff Member'] != '') & totals.notna() & ~is_internal
+        rows = rows[keep]
+        
+        # Get planned hours by month as a rows x months float32 matrix (month columns are
+        # in date order); each column is coerced once and blanks/text count as no hours
+        month_periods = pd.PeriodIndex([m['period'] for m in month_cols], freq='M')
+        monthly_plan = assignments_df.loc[keep, [m['column'] for m in month_cols]].apply(pd.to_numeric, errors='coerce')
+        monthly_plan = monthly_plan.where(monthly_plan > 0, 0).astype('float32')
+        monthly_plan.columns = month_periods
+        
+        # First and last months with planned hours (NaT when a row plans none)
+        has_hours = monthly_plan.to_numpy() > 0
+        any_hours = has_hours.any(axis=1)
+        first_idx = has_hours.argmax(axis=1)
+        last_idx = has_hours.shape[1] - 1 - has_hours[:, ::-1].argmax(axis=1)
+        
+        resources = pd.DataFrame({
+            'Staff_Member': rows['Staff Member'],
+            'Client': rows['Client'],
+            'Project_Name': rows['Project Name'],
+            'Project_ID': normalize_project_ids(rows['Project ID']),
+            'Total_Assigned': totals[keep],
+            'First_Month': pd.Series(month_periods[first_idx], index=rows.index).where(any_hours),
+            'Last_Month': pd.Series(month_periods[last_idx], index=rows.index).where(any_hours)
+        })
         
         st.success(f"✅ Processed {len(resources)} resource assignments")
     
@@ -269,11 +289,19 @@ if st.button("🎯 Run Resource Check", type="primary"):
     # ============================================================
     
     with st.spinner("📊 Calculating actuals..."):
+        # Group on just the key and hours columns, with the string keys as categories
+        # (observed=True keeps the groupby to combinations that actually occur)
+        bt_hours = bt_time[['Staff_Member', 'Project_ID', 'Month', 'Hours']].astype({
+            'Staff_Member': 'category',
+            'Project_ID': 'category'
+        })
+        
         # Aggregate actuals by staff + project + month
-        actuals_monthly = bt_time.groupby(['Staff_Member', 'Project_ID', 'Month'])['Hours'].sum().reset_index()
+        actuals_monthly = bt_hours.groupby(['Staff_Member', 'Project_ID', 'Month'], observed=True)['Hours'].sum().reset_index()
         
-        # Aggregate total actuals by staff + project
-        actuals_total = bt_time.groupby(['Staff_Member', 'Project_ID'])['Hours'].sum().reset_index()
+        # Aggregate total actuals by staff + project from the (much smaller) monthly totals
+        actuals_total = actuals_monthly.groupby(['Staff_Member', 'Project_ID'], observed=True)['Hours'].sum().reset_index()
+        actuals_total = actuals_total.astype({'Staff_Member': object, 'Project_ID': object})
         actuals_total = actuals_total.rename(columns={'Hours': 'Total_Actual'})
     
     # ============================================================
@@ -281,153 +309,98 @@ if st.button("🎯 Run Resource Check", type="primary"):
     # ============================================================
     
     with st.spinner("🧮 Calculating utilization and schedule metrics..."):
-        results = []
-        
-        for resource in resources:
-            staff = resource['Staff_Member']
-            project_id = resource['Project_ID']
-            total_assigned = resource['Total_Assigned']
-            
-            # Get total actuals
-            actual_row = actuals_total[
-                (actuals_total['Staff_Member'] == staff) & 
-                (actuals_total['Project_ID'] == project_id)
-            ]
-            
-            total_actual = actual_row['Total_Actual'].iloc[0] if len(actual_row) > 0 else 0
-            
-            # Calculate percent used (avoid divide by zero for unassigned)
-            if total_assigned > 0:
-                percent_used = (total_actual / total_assigned) * 100
-                is_unassigned = False
-            else:
-                # Unassigned work (actuals exist but no assignment)
-                if total_actual > 0:
-                    percent_used = 999  # Flag as massive overrun
-                    is_unassigned = True
-                else:
-                    percent_used = 0
-                    is_unassigned = False
-            
-            # Calculate schedule metrics
-            first_month = resource['First_Month']
-            last_month = resource['Last_Month']
-            
-            if first_month and last_month and total_assigned > 0:
-                # Count months in schedule
-                current_period = pd.Period(datetime.now(), freq='M')
-                
-                # Calculate total planned months
-                total_months = 0
-                m = first_month
-                while m <= last_month:
-                    total_months += 1
-                    m += 1
-                
-                # Calculate elapsed months
-                elapsed_months = 0
-                m = first_month
-                while m <= min(current_period, last_month):
-                    elapsed_months += 1
-                    m += 1
-                
-                # Schedule progress
-                if total_months > 0:
-                    schedule_progress = elapsed_months / total_months
-                    expected_hours_to_date = total_assigned * schedule_progress
-                    
-                    if expected_hours_to_date > 0:
-                        pace_ratio = total_actual / expected_hours_to_date
-                    else:
-                        pace_ratio = 0
-                else:
-                    schedule_progress = 0
-                    expected_hours_to_date = 0
-                    pace_ratio = 0
-            else:
-                schedule_progress = 0
-                expected_hours_to_date = 0
-                pace_ratio = 0
-            
-            # Get statuses
-            util_status = get_utilization_status(percent_used)
-            sched_status = get_schedule_status(pace_ratio)
-            
-            # Delta vs target
-            delta = total_actual - total_assigned
-            
-            results.append({
-                'Staff_Member': staff,
-                'Client': resource['Client'],
-                'Project_Name': resource['Project_Name'],
-                'Project_ID': project_id,
-                'Total_Assigned': total_assigned,
-                'Total_Actual': total_actual,
-                'Percent_Used': percent_used,
-                'Utilization_Status': util_status['status'],
-                'Utilization_Color': util_status['color'],
-                'Sort_Order': util_status['sort_order'],
-                'Schedule_Status': sched_status,
-                'Pace_Ratio': pace_ratio,
-                'Expected_Hours': expected_hours_to_date,
-                'Delta': delta,
-                'Is_Unassigned': is_unassigned,
-                'First_Month': first_month,
-                'Last_Month': last_month,
-                'Monthly_Plan': resource['Monthly_Plan']
-            })
-        
-        # Also check for unassigned work (actuals with no assignment)
-        unassigned_work = []
-        for _, actual in actuals_total.iterrows():
-            staff = actual['Staff_Member']
-            project_id = actual['Project_ID']
-            total_actual = actual['Total_Actual']
-            
-            # Check if this combo exists in assignments
-            exists = any(
-                r['Staff_Member'] == staff and r['Project_ID'] == project_id
-                for r in resources
-            )
-            
-            if not exists and total_actual > 0:
-                # Unassigned work
-                util_status = get_utilization_status(999)
-                
-                # Try to get project name from BigTime data
-                bt_project_name = bt_time[bt_time['Project_ID'] == project_id]['Project'].iloc[0] if 'Project' in bt_time.columns else 'Unknown'
-                bt_client_name = bt_time[bt_time['Project_ID'] == project_id]['Client'].iloc[0] if 'Client' in bt_time.columns else 'Unknown'
-                
-                unassigned_work.append({
-                    'Staff_Member': staff,
-                    'Client': bt_client_name,
-                    'Project_Name': bt_project_name,
-                    'Project_ID': project_id,
-                    'Total_Assigned': 0,
-                    'Total_Actual': total_actual,
-                    'Percent_Used': 999,
-                    'Utilization_Status': 'Overrun',
-                    'Utilization_Color': '🔴',
-                    'Sort_Order': 1,
-                    'Schedule_Status': 'N/A',
-                    'Pace_Ratio': 0,
-                    'Expected_Hours': 0,
-                    'Delta': total_actual,
-                    'Is_Unassigned': True,
-                    'First_Month': None,
-                    'Last_Month': None,
-                    'Monthly_Plan': {}
-                })
-                
-                results.append(unassigned_work[-1])
+        # Join total actuals onto every resource in one pass
+        results_df = resources.merge(actuals_total, on=['Staff_Member', 'Project_ID'], how='left')
+        results_df['Total_Actual'] = results_df['Total_Actual'].fillna(0)
+        
+        total_assigned = results_df['Total_Assigned']
+        total_actual = results_df['Total_Actual']
+        
+        # Calculate percent used (avoid divide by zero for unassigned)
+        # Unassigned work (actuals exist but no assignment) is flagged as a massive overrun
+        is_unassigned = (total_assigned <= 0) & (total_actual > 0)
+        results_df['Percent_Used'] = np.where(
+            total_assigned > 0,
+            total_actual / total_assigned.where(total_assigned > 0) * 100,
+            np.where(is_unassigned, 999, 0)
+        )
+        results_df['Is_Unassigned'] = is_unassigned
+        
+        # Calculate schedule metrics - months counted as year * 12 + month
+        first_month = results_df['First_Month']
+        last_month = results_df['Last_Month']
+        has_schedule = first_month.notna() & last_month.notna() & (total_assigned > 0)
+        
+        current_period = pd.Period(datetime.now(), freq='M')
+        current_index = current_period.year * 12 + current_period.month
+        first_index = first_month.dt.year * 12 + first_month.dt.month
+        last_index = last_month.dt.year * 12 + last_month.dt.month
+        
+        # Total planned months, and elapsed months up to the current month
+        total_months = (last_index - first_index + 1).where(has_schedule, 0)
+        elapsed_months = (np.minimum(current_index, last_index) - first_index + 1).clip(lower=0)
+        
+        # Schedule progress
+        schedule_progress = (elapsed_months / total_months.where(total_months > 0)).fillna(0)
+        expected_hours_to_date = total_assigned * schedule_progress
+        results_df['Expected_Hours'] = expected_hours_to_date
+        results_df['Pace_Ratio'] = (total_actual / expected_hours_to_date.where(expected_hours_to_date > 0)).fillna(0)
+        
+        # Delta vs target
+        results_df['Delta'] = total_actual - total_assigned
+        
+        # Also check for unassigned work (actuals with no assignment) - an anti-join
+        # of the actuals against every assigned (staff, project) combo
+        assigned_keys = resources[['Staff_Member', 'Project_ID']].drop_duplicates()
+        unassigned_df = actuals_total.merge(assigned_keys, on=['Staff_Member', 'Project_ID'], how='left', indicator=True)
+        unassigned_df = unassigned_df[
+            (unassigned_df['_merge'] == 'left_only') & (unassigned_df['Total_Actual'] > 0)
+        ].drop(columns='_merge')
+        
+        # Try to get project name from BigTime data - first entry per project, looked up once
+        name_cols = {'Client': 'Client', 'Project': 'Project_Name'}
+        project_names = (
+            bt_time.reindex(columns=['Project_ID', *name_cols])
+            .drop_duplicates('Project_ID')
+            .set_index('Project_ID')
+            .rename(columns=name_cols)
+        )
+        for col, name_col in name_cols.items():
+            if col not in bt_time.columns:
+                project_names[name_col] = 'Unknown'
+        
+        unassigned_df = unassigned_df.join(project_names, on='Project_ID').assign(
+            Total_Assigned=0,
+            Percent_Used=999,
+            Utilization_Status='Overrun',
+            Utilization_Color='🔴',
+            Sort_Order=1,
+            Schedule_Status='N/A',
+            Pace_Ratio=0,
+            Expected_Hours=0,
+            Delta=unassigned_df['Total_Actual'],
+            Is_Unassigned=True,
+            First_Month=None,
+            Last_Month=None
+        )
         
-        if unassigned_work:
-            st.warning(f"⚠️ Found {len(unassigned_work)} project(s) with actuals but no assignment in sheet")
+        if not unassigned_df.empty:
+            st.warning(f"⚠️ Found {len(unassigned_df)} project(s) with actuals but no assignment in sheet")
             with st.expander("🔍 Debug: Unassigned Work Details"):
-                for uw in unassigned_work:
-                    st.write(f"- **{uw['Staff_Member']}** worked {uw['Total_Actual']:.1f} hrs on Project ID **{uw['Project_ID']}** ({uw['Project_Name']}) but has no assignment in Google Sheet")
-        
-        results_df = pd.DataFrame(results)
+                for uw in unassigned_df.itertuples():
+                    st.write(f"- **{uw.Staff_Member}** worked {uw.Total_Actual:.1f} hrs on Project ID **{uw.Project_ID}** ({uw.Project_Name}) but has no assignment in Google Sheet")
+            
+            results_df = pd.concat([results_df, unassigned_df], ignore_index=True)
+        results_df = results_df.reindex(columns=RESULT_COLUMNS)
+        
+        # Statuses for every row in one pass; unassigned work keeps its fixed N/A schedule
+        util_status = utilization_status_vec(results_df['Percent_Used'])
+        results_df['Utilization_Status'] = util_status['status']
+        results_df['Utilization_Color'] = util_status['color']
+        results_df['Sort_Order'] = util_status['sort_order'].astype('int8')
+        results_df['Schedule_Status'] = results_df['Schedule_Status'].fillna(
+            schedule_status_vec(results_df['Pace_Ratio'])
+        )
         
         # Filter out records where both assigned and actual are 0
         # These are placeholders with no work and no plan
@@ -436,10 +409,51 @@ if st.button("🎯 Run Resource Check", type="primary"):
         ]
         
         # Sort: worst problems first
-        results_df = results_df.sort_values(['Sort_Order', 'Pace_Ratio'])
+        results_df = results_df.sort_values(['Sort_Order', 'Pace_Ratio'], ignore_index=True)
         
         st.success(f"✅ Generated {len(results_df)} resource-project combinations")
     
+    # Planned hours per resource, one column per month
+    plan_export = pd.concat([
+        resources[['Staff_Member', 'Client', 'Project_Name', 'Project_ID']],
+        monthly_plan.rename(columns=str)
+    ], axis=1)
+    
+    return results_df, plan_export, not missing_years
+
+# ============================================================
+# DATE RANGE SELECTION
+# ============================================================
+
+st.subheader("Analysis Period")
+
+today = date.today()
+default_start = date(today.year, 1, 1)
+default_end = date(today.year, 12, 31)
+
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input("Start Date", value=default_start)
+with col2:
+    end_date = st.date_input("End Date", value=default_end)
+
+if st.button("🎯 Run Resource Check", type="primary"):
+    results_df, plan_export = run_resource_check(start_date, end_date)
+    
+    # Keep the results across reruns so changing a filter re-filters the stored
+    # frame instead of dropping the report
+    st.session_state['resource_check'] = {
+        'range': (start_date, end_date),
+        'results_df': results_df,
+        'plan_export': plan_export
+    }
+
+check = st.session_state.get('resource_check')
+
+if check and check['range'] == (start_date, end_date):
+    results_df = check['results_df']
+    plan_export = check['plan_export']
+    
     # ============================================================
     # DISPLAY RESULTS
     # ============================================================
@@ -468,24 +482,30 @@ if st.button("🎯 Run Resource Check", type="primary"):
     
     # Filters
     st.subheader("🔍 Filters")
+    
+    # Option lists, built once per run (blank names can't be sorted against strings)
+    staff_options = sorted(pd.unique(results_df['Staff_Member'].dropna()))
+    client_options = sorted(pd.unique(results_df['Client'].dropna()))
+    project_options = sorted(pd.unique(results_df['Project_Name'].dropna()))
+    
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         staff_filter = st.multiselect(
             "Staff Member",
-            options=sorted(results_df['Staff_Member'].unique()),
+            options=staff_options,
             default=[]
         )
     with col2:
         client_filter = st.multiselect(
             "Client",
-            options=sorted(results_df['Client'].unique()),
+            options=client_options,
             default=[]
         )
     with col3:
         project_filter = st.multiselect(
             "Project",
-            options=sorted(results_df['Project_Name'].unique()),
+            options=project_options,
             default=[]
         )
     with col4:
@@ -501,18 +521,18 @@ if st.button("🎯 Run Resource Check", type="primary"):
             default=[]
         )
     
-    # Apply filters
-    filtered_df = results_df.copy()
-    if staff_filter:
-        filtered_df = filtered_df[filtered_df['Staff_Member'].isin(staff_filter)]
-    if client_filter:
-        filtered_df = filtered_df[filtered_df['Client'].isin(client_filter)]
-    if project_filter:
-        filtered_df = filtered_df[filtered_df['Project_Name'].isin(project_filter)]
-    if util_filter:
-        filtered_df = filtered_df[filtered_df['Utilization_Status'].isin(util_filter)]
-    if sched_filter:
-        filtered_df = filtered_df[filtered_df['Schedule_Status'].isin(sched_filter)]
+    # Apply filters - AND the masks together and slice once
+    mask = np.ones(len(results_df), dtype=bool)
+    for column, selected in [
+        ('Staff_Member', staff_filter),
+        ('Client', client_filter),
+        ('Project_Name', project_filter),
+        ('Utilization_Status', util_filter),
+        ('Schedule_Status', sched_filter)
+    ]:
+        if selected:
+            mask &= results_df[column].isin(selected).to_numpy()
+    filtered_df = results_df[mask]
     
     st.info(f"Showing {len(filtered_df)} of {len(results_df)} resources")
     
@@ -526,12 +546,10 @@ if st.button("🎯 Run Resource Check", type="primary"):
     display_df['Status'] = display_df['Utilization_Color'] + ' ' + display_df['Utilization_Status']
     
     # Add unassigned flag
-    display_df['Flags'] = display_df.apply(
-        lambda row: '⚠️ Unassigned' if row['Is_Unassigned'] else '',
-        axis=1
-    )
+    display_df['Flags'] = np.where(display_df['Is_Unassigned'].to_numpy(dtype=bool), '⚠️ Unassigned', '')
     
-    display_df['Pace'] = display_df['Pace_Ratio'].apply(lambda x: f"{x:.2f}×" if x > 0 else 'N/A')
+    pace_ratio = display_df['Pace_Ratio'].to_numpy(dtype=float)
+    display_df['Pace'] = np.where(pace_ratio > 0, np.char.mod('%.2f×', pace_ratio), 'N/A')
     
     display_columns = [
         'Flags', 'Staff_Member', 'Client', 'Project_Name', 'Project_ID',
@@ -571,8 +589,11 @@ if st.button("🎯 Run Resource Check", type="primary"):
     try:
         output = BytesIO()
         
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # xlsxwriter streams cells straight to the file instead of building openpyxl's
+        # cell tree (constant_memory stays off: pandas writes column by column)
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             results_df.to_excel(writer, sheet_name='Resource_Check', index=False)
+            plan_export.to_excel(writer, sheet_name='Monthly_Plan', index=False)
         
         excel_data = output.getvalue()
         filename = f"resource_check_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.xlsx"
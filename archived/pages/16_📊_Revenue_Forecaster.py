@@ -337,8 +337,7 @@ if st.button("📊 Generate Revenue Forecast", type="primary"):
         years_needed = list(range(start_date.year, end_date.year + 1))
         bt_time_list = []
         
-        for year in years_needed:
-            bt_year = bigtime.get_time_report(year)
+        for bt_year in bigtime.get_time_reports(years_needed).values():
             if bt_year is not None and not bt_year.empty:
                 bt_time_list.append(bt_year)
         
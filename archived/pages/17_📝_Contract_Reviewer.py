@@ -6,13 +6,19 @@ Upload a contract and get detailed feedback based on Voyage Advisory's contract
 import streamlit as st
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import os
 import json
+import re
+import hashlib
 import tempfile
 import subprocess
+import zipfile
 from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 
 # Authentication check
 if 'authenticated' not in st.session_state or not st.session_state.authenticated:
@@ -32,12 +38,61 @@ except:
     CLAUDE_API_KEY = None
     CONTRACT_STANDARDS_DOC_ID = "1RbPIYVgYH1HZ-FQTHYbQWycHshe-K_L5OZkat45VQnQ"
 
+# Concurrent Claude calls when several contracts are uploaded together
+REVIEW_WORKERS = 5
+
+# Claude's context is 200k tokens. Prompts estimated past PROMPT_TOKEN_LIMIT (at roughly
+# CHARS_PER_TOKEN characters per token) are reviewed in CHUNK_TOKENS pieces and merged
+PROMPT_TOKEN_LIMIT = 150_000
+CHUNK_TOKENS = 30_000
+CHARS_PER_TOKEN = 4
+
+# Finished reviews kept for re-runs of the same contract against the same standards
+REVIEW_CACHE_SIZE = 128
+
+# Review markdown patterns used when building the DOCX
+_BOLD_RE = re.compile(r'(\*\*[^*]+\*\*)')
+_NUM_RE = re.compile(r'^\d+\.\s')
+_BULLET_PREFIXES = ('• ', '- ', '* ')
+
+# Legacy .doc fallback: control bytes (except tab/LF/CR) become spaces, then whitespace is tidied
+_DOC_CTRL_TABLE = bytes(
+    0x20 if (b < 0x20 and b not in (0x09, 0x0a, 0x0d)) or 0x7f <= b <= 0x9f else b
+    for b in range(256)
+)
+# Everything that isn't a visible latin-1 glyph, for the cheap "is there any text?" check
+_DOC_NON_GLYPH_BYTES = bytes(b for b in range(256) if not (0x21 <= b <= 0x7e or 0xa1 <= b <= 0xff))
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+@st.cache_resource
+def get_http_session():
+    """Shared keep-alive session so repeat reviews reuse the TLS connections to Google and Anthropic"""
+    # Retry throttling/overload responses (Anthropic answers 529 when overloaded) - those
+    # requests were never processed, so a POST is safe to resend. Read errors are not
+    # retried: the review may already be generating (and billed) on the other end.
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504, 529],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource(ttl=3600)
 def get_google_credentials():
-    """Get Google credentials from Streamlit secrets"""
+    """Get Google credentials from Streamlit secrets (cached, so the key is parsed once and tokens are reused)"""
     try:
         from google.oauth2.service_account import Credentials
         
@@ -75,59 +130,126 @@ def get_google_credentials():
     except Exception as e:
         return None
 
-def fetch_google_doc_content(doc_id):
-    """Fetch content from a Google Doc - tries public export first, then authenticated"""
-    
-    # Try public export first (simplest approach - works if doc is "Anyone with link")
-    try:
-        export_url = f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
-        response = requests.get(export_url, timeout=30)
-        
-        if response.status_code == 200:
-            return response.text
-    except Exception as e:
-        pass
+def preview_text(text, limit=3000):
+    """First `limit` characters of extracted text for the preview expander"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+def _try_public(doc_id):
+    """Fetch a Google Doc through the public export link (works if doc is "Anyone with link")"""
+    export_url = f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
+    response = get_http_session().get(export_url, timeout=8)
     
-    # Try authenticated access as fallback
+    if response.status_code == 200:
+        return response.text
+    return None
+
+def _try_drive(doc_id):
+    """Fetch a Google Doc as plain text through the Drive API with the service account"""
     credentials = get_google_credentials()
     
-    if credentials:
-        try:
-            from googleapiclient.discovery import build
-            
-            # Use Drive API to export as plain text
-            drive_service = build('drive', 'v3', credentials=credentials)
-            
-            request = drive_service.files().export_media(
-                fileId=doc_id,
-                mimeType='text/plain'
-            )
-            
-            content = request.execute()
-            
-            if isinstance(content, bytes):
-                content = content.decode('utf-8')
-            
-            return content
+    if not credentials:
+        return None
+    
+    # Call the export endpoint directly with a bearer token - no discovery-based client to build.
+    # The cached credentials keep their token until it is close to expiring.
+    if not credentials.valid:
+        from google.auth.transport.requests import Request
+        credentials.refresh(Request(session=get_http_session()))
+    
+    response = get_http_session().get(
+        f"https://www.googleapis.com/drive/v3/files/{doc_id}/export",
+        params={'mimeType': 'text/plain'},
+        headers={'Authorization': f'Bearer {credentials.token}'},
+        timeout=30
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.status_code} - {response.text[:200]}")
+    
+    return response.content.decode('utf-8')
+
+def _fetch_doc_text(doc_id):
+    """Race the public export against authenticated access - returns (content, drive_error)"""
+    
+    # Both attempts are network-bound, so run them side by side and take the first
+    # one that comes back with content. A private doc no longer waits out the public timeout.
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = {
+        executor.submit(_try_public, doc_id): 'public',
+        executor.submit(_try_drive, doc_id): 'drive'
+    }
+    drive_error = None
+    
+    try:
+        for future in as_completed(futures, timeout=35):
+            try:
+                content = future.result()
+            except Exception as e:
+                if futures[future] == 'drive':
+                    drive_error = e
+                continue
             
-        except Exception as e:
-            st.warning(f"Authenticated access also failed: {e}")
+            if content is not None:
+                return content, None
+    except FuturesTimeout:
+        pass
+    finally:
+        # Don't block on the slower attempt once we have an answer
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return None, drive_error
+
+def _report_fetch_failure(drive_error):
+    """Show why a Google Doc couldn't be fetched"""
+    if drive_error:
+        st.warning(f"Authenticated access also failed: {drive_error}")
     
     st.error("Could not fetch Google Doc. Please ensure the document is shared as 'Anyone with the link can view'")
-    return None
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_standards_text(doc_id):
+    """Fetch the contract standards doc (cached - it changes rarely)"""
+    content, drive_error = _fetch_doc_text(doc_id)
+    
+    if content is None:
+        # Raise rather than return None so a failed fetch isn't cached
+        raise RuntimeError(drive_error)
+    
+    return content
+
+def load_standards_text(doc_id):
+    """Get the contract standards text, reusing the cached copy when there is one"""
+    try:
+        return _load_standards_text(doc_id)
+    except RuntimeError as e:
+        _report_fetch_failure(e.args[0])
+        return None
 
 def extract_text_from_pdf(pdf_file):
-    """Extract text from uploaded PDF using PyPDF2"""
+    """Extract text from uploaded PDF using pypdfium2 (PDFium - much faster than pure-Python parsers)"""
     try:
-        import PyPDF2
+        import pypdfium2 as pdfium
         
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        # Hand PDFium the upload buffer itself - it reads pages through it on demand,
+        # so the PDF isn't copied into a second bytes object
+        pdf = pdfium.PdfDocument(pdf_file)
         
-        text_parts = []
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(f"--- Page {page_num + 1} ---\n{page_text}")
+        try:
+            # Pages are read sequentially on purpose: PDFium isn't thread-safe, even across
+            # separate documents, and native extraction is only a few ms per page anyway
+            text_parts = []
+            for page_num, page in enumerate(pdf):
+                try:
+                    textpage = page.get_textpage()
+                    page_text = textpage.get_text_range().replace('\r\n', '\n')
+                    textpage.close()
+                finally:
+                    page.close()
+                
+                if page_text.strip():
+                    text_parts.append(f"--- Page {page_num + 1} ---\n{page_text}")
+        finally:
+            pdf.close()
         
         if text_parts:
             return "\n\n".join(text_parts)
@@ -136,7 +258,7 @@ def extract_text_from_pdf(pdf_file):
             return None
             
     except ImportError:
-        st.error("PyPDF2 not installed. Please add 'PyPDF2' to requirements.txt")
+        st.error("pypdfium2 not installed. Please add 'pypdfium2' to requirements.txt")
         return None
     except Exception as e:
         st.error(f"Error extracting PDF text: {e}")
@@ -191,22 +313,18 @@ def extract_text_from_doc(doc_file):
         except:
             pass
         
-        # Reset file position
-        doc_file.seek(0)
-        
         # Try reading raw text (works for some older formats)
         try:
-            content = doc_file.read()
-            # Try to decode as text, extracting readable portions
-            if isinstance(content, bytes):
-                # Extract ASCII text portions
-                import re
-                text = content.decode('latin-1', errors='ignore')
-                # Remove control characters but keep newlines
-                text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', ' ', text)
+            # getvalue() hands back the upload's own bytes without copying them
+            content = doc_file.getvalue()
+            # Try to decode as text, extracting readable portions. Files without even 100 visible
+            # characters are rejected on the raw bytes, before a file-sized string is built.
+            if len(content.translate(None, _DOC_NON_GLYPH_BYTES)) >= 100:
+                # Blank out control characters (but keep tabs/newlines) at the byte level in one C pass
+                text = content.translate(_DOC_CTRL_TABLE).decode('latin-1')
                 # Clean up multiple spaces
-                text = re.sub(r' +', ' ', text)
-                text = re.sub(r'\n\s*\n', '\n\n', text)
+                text = _MULTI_SPACE_RE.sub(' ', text)
+                text = _BLANK_LINES_RE.sub('\n\n', text)
                 if len(text.strip()) > 100:
                     return text.strip()
         except:
@@ -219,21 +337,7 @@ def extract_text_from_doc(doc_file):
         st.error(f"Error extracting DOC text: {e}")
         return None
 
-def call_claude_api(contract_text, standards_text):
-    """Call Claude API to review contract"""
-    if not CLAUDE_API_KEY:
-        st.error("❌ Claude API key not configured")
-        return None
-    
-    prompt = f"""You are a legal contract reviewer for Voyage Advisory LLC. Your task is to review the contract provided below against Voyage's contract standards.
-
-## Voyage Contract Standards
-{standards_text}
-
-## Contract to Review
-{contract_text}
-
-## Instructions
+REVIEW_INSTRUCTIONS = """## Instructions
 Please provide a comprehensive review of the contract following this format:
 
 ### GENERAL COMMENTS
@@ -270,130 +374,253 @@ Remember:
 - Check entity names in preamble and signature blocks
 - Verify master agreement references if this is a SOW"""
 
-    try:
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": CLAUDE_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 8000,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ]
-            },
-            timeout=120
+def _review_prompt(contract_text, standards_text, part=None):
+    """Build the review prompt - part is (number, total) when the contract is reviewed in pieces"""
+    part_note = ""
+    if part:
+        part_note = (
+            f"\n\nNote: this is part {part[0]} of {part[1]} of a longer contract. Review only the text below; "
+            "the other parts are reviewed separately and the findings merged afterwards."
         )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data['content'][0]['text']
-        else:
-            st.error(f"Claude API error: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        st.error(f"Error calling Claude API: {e}")
-        return None
+    
+    return f"""You are a legal contract reviewer for Voyage Advisory LLC. Your task is to review the contract provided below against Voyage's contract standards.{part_note}
 
-def create_review_docx(review_text, contract_name):
-    """Create a DOCX file from the review text using python-docx"""
-    try:
-        from docx import Document
-        from docx.shared import Inches, Pt, RGBColor
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.enum.style import WD_STYLE_TYPE
-        import re
-        
-        doc = Document()
-        
-        # Set up styles
-        style = doc.styles['Normal']
-        style.font.name = 'Arial'
-        style.font.size = Pt(11)
-        
-        # Title
-        title = doc.add_heading('Contract Review Report', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Subtitle info
-        subtitle = doc.add_paragraph()
-        subtitle.add_run(f'Contract: {contract_name}').italic = True
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        date_para = doc.add_paragraph()
-        date_para.add_run(f'Review Date: {datetime.now().strftime("%B %d, %Y")}').italic = True
-        date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        doc.add_paragraph()  # Blank line
-        
-        # Process the review text
-        lines = review_text.split('\n')
-        
-        for line in lines:
-            trimmed = line.strip()
-            
-            if not trimmed:
-                doc.add_paragraph()
-                continue
-            
-            # Main headings (### HEADING)
-            if trimmed.startswith('### '):
-                heading_text = trimmed.replace('### ', '').replace('**', '')
-                doc.add_heading(heading_text, level=1)
-                continue
-            
-            # Sub-headings (numbered like 1. 2. etc)
-            if re.match(r'^\d+\.\s', trimmed):
-                doc.add_heading(trimmed, level=2)
+## Voyage Contract Standards
+{standards_text}
+
+## Contract to Review
+{contract_text}
+
+{REVIEW_INSTRUCTIONS}"""
+
+def _merge_prompt(part_reviews):
+    """Build the prompt that combines per-part reviews into one"""
+    reviews = "\n\n".join(
+        f"## Review of Part {number}\n{review}" for number, review in enumerate(part_reviews, 1)
+    )
+    
+    return f"""You are a legal contract reviewer for Voyage Advisory LLC. A long contract was reviewed against Voyage's contract standards in {len(part_reviews)} consecutive parts. Combine the part reviews below into a single review of the whole contract. Merge duplicate findings, keep section numbers and proposed language exactly as written, and write the general comments and summary for the contract as a whole.
+
+{reviews}
+
+{REVIEW_INSTRUCTIONS}"""
+
+def _split_contract(contract_text, max_chars):
+    """Split contract text into pieces of at most max_chars, breaking between paragraphs where possible"""
+    parts = []
+    current = []
+    size = 0
+    
+    for para in contract_text.split("\n\n"):
+        # A single paragraph longer than a piece gets cut into slices, after flushing the
+        # paragraphs before it so the pieces stay in contract order
+        if len(para) > max_chars and current:
+            parts.append("\n\n".join(current))
+            current, size = [], 0
+
+        while len(para) > max_chars:
+            # Cut at the last whitespace that fits (mid-word only when there is none)
+            cut = max(para.rfind(ws, 0, max_chars + 1) for ws in (" ", "\n", "\t"))
+            if cut <= 0:
+                cut = max_chars
+            parts.append(para[:cut])
+            para = para[cut:].lstrip()
+
+        if not para:
+            continue
+
+        if size + len(para) > max_chars and current:
+            parts.append("\n\n".join(current))
+            current, size = [], 0
+        
+        current.append(para)
+        size += len(para) + 2
+    
+    if current:
+        parts.append("\n\n".join(current))
+    
+    return parts
+
+def _stream_claude(prompt):
+    """Send one prompt to Claude - yields the response text as it streams in"""
+    with get_http_session().post(
+        "https://api.anthropic.com/v1/messages",
+        headers={
+            "x-api-key": CLAUDE_API_KEY,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        },
+        json={
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": 8000,
+            "stream": True,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        },
+        stream=True,
+        timeout=120
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} - {response.text}")
+        
+        # Server-sent events: text arrives in content_block_delta frames
+        for line in response.iter_lines():
+            if not line.startswith(b'data: '):
                 continue
             
-            # Bullet points
-            if trimmed.startswith('• ') or trimmed.startswith('- ') or trimmed.startswith('* '):
-                bullet_text = re.sub(r'^[•\-\*]\s', '', trimmed)
-                para = doc.add_paragraph(style='List Bullet')
-                
-                # Parse bold sections **text**
-                parts = re.split(r'(\*\*[^*]+\*\*)', bullet_text)
-                for part in parts:
-                    if part.startswith('**') and part.endswith('**'):
-                        para.add_run(part[2:-2]).bold = True
-                    else:
-                        para.add_run(part)
-                continue
+            event = json.loads(line[6:].decode('utf-8'))
             
-            # Proposed Language (indented)
-            if trimmed.startswith('**Proposed Language:**') or trimmed.startswith('Proposed Language:'):
-                para = doc.add_paragraph()
-                para.paragraph_format.left_indent = Inches(0.5)
-                para.add_run('Proposed Language: ').bold = True
-                lang_text = re.sub(r'\*\*Proposed Language:\*\*|Proposed Language:', '', trimmed).strip()
-                para.add_run(lang_text).italic = True
+            if event.get('type') == 'content_block_delta' and event['delta'].get('type') == 'text_delta':
+                yield event['delta']['text']
+            elif event.get('type') == 'error':
+                raise RuntimeError(event['error'].get('message', event['error']))
+
+def call_claude_api(contract_text, standards_text):
+    """Call Claude API to review contract - yields the review text as it streams in"""
+    if not CLAUDE_API_KEY:
+        raise RuntimeError("Claude API key not configured")
+    
+    prompt = _review_prompt(contract_text, standards_text)
+    
+    if len(prompt) <= PROMPT_TOKEN_LIMIT * CHARS_PER_TOKEN:
+        yield from _stream_claude(prompt)
+        return
+    
+    # Too long for one request: review the parts side by side, then stream a merged review
+    parts = _split_contract(contract_text, CHUNK_TOKENS * CHARS_PER_TOKEN)
+    
+    def review_part(numbered_part):
+        number, part_text = numbered_part
+        return "".join(_stream_claude(_review_prompt(part_text, standards_text, (number, len(parts)))))
+    
+    with ThreadPoolExecutor(max_workers=REVIEW_WORKERS) as executor:
+        part_reviews = list(executor.map(review_part, enumerate(parts, 1)))
+    
+    yield from _stream_claude(_merge_prompt(part_reviews))
+
+def create_review_docx(review_text, contract_name):
+    """Create a DOCX file from the review text using python-docx (raises on failure - may run off the script thread)"""
+    from docx import Document
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
+    
+    doc = Document()
+    
+    # Set up styles
+    style = doc.styles['Normal']
+    style.font.name = 'Arial'
+    style.font.size = Pt(11)
+    
+    # Title
+    title = doc.add_heading('Contract Review Report', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Subtitle info
+    subtitle = doc.add_paragraph()
+    subtitle.add_run(f'Contract: {contract_name}').italic = True
+    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    date_para = doc.add_paragraph()
+    date_para.add_run(f'Review Date: {datetime.now().strftime("%B %d, %Y")}').italic = True
+    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    doc.add_paragraph()  # Blank line
+    
+    def add_bold_runs(para, text):
+        """Add text to a paragraph, bolding **marked** sections - one run per bold/plain stretch"""
+        # Splitting on the captured pattern alternates plain text (even) and **bold** spans (odd)
+        pending, pending_bold = [], False
+        for i, part in enumerate(_BOLD_RE.split(text)):
+            bold = i % 2 == 1
+            if bold:
+                part = part[2:-2]
+            if not part:
                 continue
             
-            # Regular paragraph - parse bold
+            if pending and bold != pending_bold:
+                para.add_run(''.join(pending)).bold = pending_bold or None
+                pending = []
+            pending.append(part)
+            pending_bold = bold
+        
+        if pending:
+            para.add_run(''.join(pending)).bold = pending_bold or None
+    
+    # Process the review text
+    for line in review_text.splitlines():
+        trimmed = line.strip()
+    
+        if not trimmed:
+            doc.add_paragraph()
+            continue
+    
+        # Main headings (### HEADING)
+        if trimmed.startswith('### '):
+            heading_text = trimmed.replace('### ', '').replace('**', '')
+            doc.add_heading(heading_text, level=1)
+            continue
+    
+        # Sub-headings (numbered like 1. 2. etc)
+        if _NUM_RE.match(trimmed):
+            doc.add_heading(trimmed, level=2)
+            continue
+    
+        # Bullet points
+        if trimmed.startswith(_BULLET_PREFIXES):
+            para = doc.add_paragraph(style='List Bullet')
+            add_bold_runs(para, trimmed[2:])
+            continue
+    
+        # Proposed Language (indented)
+        if trimmed.startswith('**Proposed Language:**') or trimmed.startswith('Proposed Language:'):
             para = doc.add_paragraph()
-            parts = re.split(r'(\*\*[^*]+\*\*)', trimmed)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    para.add_run(part[2:-2]).bold = True
-                else:
-                    para.add_run(part)
-        
-        # Save to bytes
-        output = BytesIO()
-        doc.save(output)
-        output.seek(0)
-        return output.getvalue()
-        
-    except ImportError as e:
-        st.error(f"python-docx not installed: {e}")
-        return None
-    except Exception as e:
-        st.error(f"Error creating DOCX: {e}")
-        return None
+            para.paragraph_format.left_indent = Inches(0.5)
+            para.add_run('Proposed Language: ').bold = True
+            lang_text = trimmed.replace('**Proposed Language:**', '').replace('Proposed Language:', '').strip()
+            para.add_run(lang_text).italic = True
+            continue
+    
+        # Regular paragraph - parse bold
+        add_bold_runs(doc.add_paragraph(), trimmed)
+    
+    # Save to bytes
+    output = BytesIO()
+    doc.save(output)
+    output.seek(0)
+    return output.getvalue()
+
+@st.cache_resource(ttl=86400)
+def _review_store():
+    """Finished reviews by review_key - shared across sessions, emptied daily"""
+    return {}
+
+def review_key(contract_text, standards_text):
+    """Content hash of a contract and the standards it is reviewed against"""
+    return tuple(
+        hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        for text in (contract_text, standards_text)
+    )
+
+def remember_review(key, review):
+    """Save a finished review, dropping the oldest beyond REVIEW_CACHE_SIZE"""
+    store = _review_store()
+    store[key] = review
+    while len(store) > REVIEW_CACHE_SIZE:
+        store.pop(next(iter(store)), None)
+
+def review_contract(contract_text, standards_text, contract_name, review=None):
+    """Run a full (non-streamed) review unless one is passed in, and build its DOCX - safe off the script thread"""
+    if review is None:
+        review = "".join(call_claude_api(contract_text, standards_text))
+    
+    try:
+        docx_bytes = create_review_docx(review, contract_name)
+    except Exception:
+        docx_bytes = None
+    
+    return review, docx_bytes
 
 # ============================================================
 # MAIN UI
@@ -404,6 +631,11 @@ if not CLAUDE_API_KEY:
     st.error("❌ Claude API key (ANTHROPIC_API_KEY) not configured in secrets")
     st.stop()
 
+# Standards are cached; this runs before anything loads them so a refresh applies to this run
+if st.sidebar.button("🔄 Refresh standards", help="Reload the contract standards Google Doc"):
+    _load_standards_text.clear()
+    st.sidebar.success("✅ Standards will be reloaded")
+
 # Input options
 st.subheader("📄 Contract Input")
 
@@ -414,30 +646,37 @@ input_method = st.radio(
 )
 
 contract_text = None
+standards_text = None
 contract_name = "Uploaded Contract"
+uploaded_contracts = []  # (name, text) for each uploaded file that extracted
 
 if input_method == "Upload File (PDF, DOC, DOCX)":
-    uploaded_file = st.file_uploader(
-        "Upload contract file",
+    uploaded_files = st.file_uploader(
+        "Upload contract file(s)",
         type=['pdf', 'doc', 'docx'],
-        help="Supported formats: PDF, DOC, DOCX"
+        accept_multiple_files=True,
+        help="Supported formats: PDF, DOC, DOCX. Upload several files to review them together."
     )
     
-    if uploaded_file:
-        contract_name = uploaded_file.name
+    for uploaded_file in uploaded_files or []:
+        file_text = None
         
         with st.spinner(f"📄 Extracting text from {uploaded_file.name}..."):
             if uploaded_file.name.lower().endswith('.pdf'):
-                contract_text = extract_text_from_pdf(uploaded_file)
+                file_text = extract_text_from_pdf(uploaded_file)
             elif uploaded_file.name.lower().endswith('.docx'):
-                contract_text = extract_text_from_docx(uploaded_file)
+                file_text = extract_text_from_docx(uploaded_file)
             elif uploaded_file.name.lower().endswith('.doc'):
-                contract_text = extract_text_from_doc(uploaded_file)
+                file_text = extract_text_from_doc(uploaded_file)
         
-        if contract_text:
-            st.success(f"✅ Extracted {len(contract_text):,} characters from {uploaded_file.name}")
-            with st.expander("Preview extracted text"):
-                st.text(contract_text[:3000] + "..." if len(contract_text) > 3000 else contract_text)
+        if file_text:
+            st.success(f"✅ Extracted {len(file_text):,} characters from {uploaded_file.name}")
+            with st.expander(f"Preview extracted text - {uploaded_file.name}"):
+                st.text(preview_text(file_text))
+            uploaded_contracts.append((uploaded_file.name, file_text))
+    
+    if uploaded_contracts:
+        contract_name, contract_text = uploaded_contracts[0]
 
 elif input_method == "Paste Text":
     contract_text = st.text_area(
@@ -457,19 +696,26 @@ elif input_method == "Google Doc URL":
     
     if google_doc_url:
         # Extract doc ID from URL
-        import re
         match = re.search(r'/document/d/([a-zA-Z0-9-_]+)', google_doc_url)
         if match:
             doc_id = match.group(1)
             contract_name = f"Google Doc {doc_id[:8]}..."
             
+            # Load the standards alongside the contract so the review doesn't need another
+            # round trip. The standards load stays on the script thread for the cache.
             with st.spinner("📄 Fetching Google Doc..."):
-                contract_text = fetch_google_doc_content(doc_id)
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    contract_future = executor.submit(_fetch_doc_text, doc_id)
+                    standards_text = load_standards_text(CONTRACT_STANDARDS_DOC_ID)
+                    contract_text, drive_error = contract_future.result()
+                
+                if contract_text is None:
+                    _report_fetch_failure(drive_error)
             
             if contract_text:
                 st.success(f"✅ Fetched {len(contract_text):,} characters")
                 with st.expander("Preview extracted text"):
-                    st.text(contract_text[:3000] + "..." if len(contract_text) > 3000 else contract_text)
+                    st.text(preview_text(contract_text))
         else:
             st.error("Invalid Google Doc URL. Please provide a valid URL.")
 
@@ -480,7 +726,8 @@ if st.button("🔍 Review Contract", type="primary", disabled=not contract_text)
     
     # Load standards
     with st.spinner("📚 Loading Voyage contract standards..."):
-        standards_text = fetch_google_doc_content(CONTRACT_STANDARDS_DOC_ID)
+        if not standards_text:
+            standards_text = load_standards_text(CONTRACT_STANDARDS_DOC_ID)
         
         if not standards_text:
             st.error("❌ Could not load contract standards")
@@ -488,49 +735,134 @@ if st.button("🔍 Review Contract", type="primary", disabled=not contract_text)
         
         st.success("✅ Loaded contract standards")
     
-    # Call Claude
-    with st.spinner("🤖 Analyzing contract with Claude AI... (this may take 1-2 minutes)"):
-        review_result = call_claude_api(contract_text, standards_text)
-    
-    if review_result:
-        st.success("✅ Review complete!")
-        
-        # Display review
+    if len(uploaded_contracts) > 1:
+        # Several contracts: the reviews are Anthropic-bound, so run them side by side
+        # (no streaming - the page can only be written from the script thread)
         st.divider()
         st.header("📋 Contract Review Results")
         
-        # Show the review in markdown
-        st.markdown(review_result)
+        # Contracts already reviewed against these standards skip the Claude call
+        keys = [review_key(text, standards_text) for _, text in uploaded_contracts]
+        saved_reviews = [_review_store().get(key) for key in keys]
         
-        # Create downloadable DOCX
-        st.divider()
-        st.subheader("📥 Download Report")
+        with st.spinner(f"🤖 Analyzing {len(uploaded_contracts)} contracts with Claude AI... (this may take 1-2 minutes)"):
+            with ThreadPoolExecutor(max_workers=REVIEW_WORKERS) as executor:
+                futures = [
+                    executor.submit(review_contract, text, standards_text, name, saved)
+                    for (name, text), saved in zip(uploaded_contracts, saved_reviews)
+                ]
         
-        with st.spinner("Creating Word document..."):
-            docx_bytes = create_review_docx(review_result, contract_name)
+        zip_buffer = BytesIO()
+        reviewed = 0
+        used_names = set()
+        
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for (name, _), key, future in zip(uploaded_contracts, keys, futures):
+                try:
+                    review_result, docx_bytes = future.result()
+                except Exception as e:
+                    st.error(f"❌ {name}: Error calling Claude API: {e}")
+                    continue
+                
+                remember_review(key, review_result)
+                
+                with st.expander(f"📋 {name}"):
+                    st.markdown(review_result)
+                
+                # Word document when it built, plain text otherwise; keep names unique in the zip
+                stem = f"Contract_Review_{os.path.splitext(name)[0]}"
+                if stem in used_names:
+                    stem = f"{stem}_{reviewed + 1}"
+                used_names.add(stem)
+                
+                if docx_bytes:
+                    zf.writestr(f"{stem}.docx", docx_bytes)
+                else:
+                    zf.writestr(f"{stem}.txt", review_result)
+                reviewed += 1
         
-        if docx_bytes:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"Contract_Review_{timestamp}.docx"
+        if reviewed:
+            st.success(f"✅ Reviewed {reviewed} of {len(uploaded_contracts)} contracts")
+            
+            st.divider()
+            st.subheader("📥 Download Reports")
             
             st.download_button(
-                label="📥 Download Review as Word Document",
-                data=docx_bytes,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                label=f"📥 Download {reviewed} Reviews (.zip)",
+                data=zip_buffer.getvalue(),
+                file_name=f"Contract_Reviews_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                mime="application/zip",
                 use_container_width=True
             )
         else:
-            # Fallback to text download
-            st.download_button(
-                label="📥 Download Review as Text",
-                data=review_result,
-                file_name=f"Contract_Review_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                mime="text/plain",
-                use_container_width=True
-            )
+            st.error("❌ Failed to generate reviews")
+    
     else:
-        st.error("❌ Failed to generate review")
+        # Call Claude - the review renders as it streams in rather than after the full 1-2 minutes
+        st.divider()
+        st.header("📋 Contract Review Results")
+        
+        # An identical contract + standards pair reuses the earlier review instead of a new Claude call
+        key = review_key(contract_text, standards_text)
+        review_result = _review_store().get(key)
+        
+        if review_result:
+            st.caption("♻️ Same contract and standards as an earlier review - showing the saved result")
+            st.markdown(review_result)
+        else:
+            try:
+                review_result = st.write_stream(call_claude_api(contract_text, standards_text))
+            except Exception as e:
+                st.error(f"Error calling Claude API: {e}")
+                review_result = None
+            
+            if review_result:
+                remember_review(key, review_result)
+        
+        if review_result:
+            # Build the Word document in the background while the rest of the page renders
+            docx_executor = ThreadPoolExecutor(max_workers=1)
+            docx_future = docx_executor.submit(create_review_docx, review_result, contract_name)
+            docx_executor.shutdown(wait=False)
+            
+            st.success("✅ Review complete!")
+            
+            # Create downloadable DOCX
+            st.divider()
+            st.subheader("📥 Download Report")
+            
+            with st.spinner("Creating Word document..."):
+                try:
+                    docx_bytes = docx_future.result()
+                except ImportError as e:
+                    st.error(f"python-docx not installed: {e}")
+                    docx_bytes = None
+                except Exception as e:
+                    st.error(f"Error creating DOCX: {e}")
+                    docx_bytes = None
+            
+            if docx_bytes:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"Contract_Review_{timestamp}.docx"
+                
+                st.download_button(
+                    label="📥 Download Review as Word Document",
+                    data=docx_bytes,
+                    file_name=filename,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    use_container_width=True
+                )
+            else:
+                # Fallback to text download
+                st.download_button(
+                    label="📥 Download Review as Text",
+                    data=review_result,
+                    file_name=f"Contract_Review_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                    mime="text/plain",
+                    use_container_width=True
+                )
+        else:
+            st.error("❌ Failed to generate review")
 
 else:
     if not contract_text:
@@ -541,7 +873,7 @@ with st.expander("ℹ️ About Contract Reviewer"):
     st.markdown("""
     ### How It Works
     
-    1. **Upload or paste** your contract (PDF, DOC, DOCX, or text)
+    1. **Upload or paste** your contract (PDF, DOC, DOCX, or text) - upload several files to review them together
     2. The app loads **Voyage's contract standards** from Google Docs
     3. **Claude AI** analyzes the contract against the standards
     4. You receive a **detailed review** with:
@@ -564,5 +896,6 @@ with st.expander("ℹ️ About Contract Reviewer"):
     ### Standards Document
     
     The contract standards are maintained in a Google Doc that can be updated at any time.
-    Changes to the standards take effect immediately for all future reviews.
+    The standards are cached for 10 minutes. Use **🔄 Refresh standards** in the sidebar
+    to pick up an edit right away.
     """)
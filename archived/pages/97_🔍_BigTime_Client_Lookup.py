@@ -50,10 +50,9 @@ if st.button("📡 Fetch Client & Project List", type="primary"):
         else:
             years_to_fetch = [current_year]
         
-        # Fetch data for all years
+        # Fetch data for all years (requested concurrently)
         df_list = []
-        for year in years_to_fetch:
-            df_year = bigtime.get_time_report(year)
+        for df_year in bigtime.get_time_reports(years_to_fetch).values():
             if df_year is not None and not df_year.empty:
                 df_list.append(df_year)
         
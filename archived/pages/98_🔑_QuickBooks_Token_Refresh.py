@@ -5,7 +5,6 @@ Re-authorize QuickBooks access and get new refresh token
 
 import streamlit as st
 import requests
-import base64
 
 # Authentication check - shared session state from Home page
 if 'authenticated' not in st.session_state or not st.session_state.authenticated:
@@ -27,6 +26,12 @@ except Exception as e:
 
 REDIRECT_URI = "https://developer.intuit.com/v2/OAuth2Playground/RedirectUrl"
 
+@st.cache_resource
+def get_http_session():
+    """Shared keep-alive session for the Intuit token endpoint"""
+    # No retries: an authorization code can only be exchanged once
+    return requests.Session()
+
 # ============================================================
 # STEP 1: GENERATE AUTHORIZATION URL
 # ============================================================
@@ -77,21 +82,14 @@ if st.button("🔄 Get Refresh Token", type="primary", disabled=not auth_code):
             # Exchange code for tokens
             url = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
             
-            auth_str = f"{CLIENT_ID}:{CLIENT_SECRET}"
-            auth_b64 = base64.b64encode(auth_str.encode()).decode()
-            
-            headers = {
-                'Authorization': f'Basic {auth_b64}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-            
             payload = {
                 'grant_type': 'authorization_code',
                 'code': auth_code.strip(),
                 'redirect_uri': REDIRECT_URI
             }
             
-            response = requests.post(url, data=payload, headers=headers)
+            # requests builds the Basic auth header and the form-encoded Content-Type itself
+            response = get_http_session().post(url, data=payload, auth=(CLIENT_ID, CLIENT_SECRET), timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
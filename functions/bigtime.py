@@ -1,6 +1,17 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson parses the large report payloads several times faster; stdlib json also takes bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Detect environment and load credentials accordingly
 try:
@@ -12,6 +23,29 @@ except ImportError:
     sys.path.append('./functions')
     import credentials
 
+# Shared keep-alive session so multi-year pulls reuse one connection to BigTime.
+# Report requests are read-only queries, so retrying them on throttling/5xx is safe.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_RETRY))
+
+# Concurrent report requests when several years are pulled at once
+REPORT_WORKERS = 4
+
+# BigTime field names -> column names the apps expect
+COLUMN_MAP = {
+    'tmstaffnm': 'Staff Member',
+    'tmchgbillbase': 'Billable ($)',
+    'tmclientnm': 'Client'
+}
+
 def get_config(key):
     """Get configuration value from Streamlit secrets or credentials.py"""
     if IN_STREAMLIT:
@@ -19,8 +53,12 @@ def get_config(key):
     else:
         return credentials.get(key).strip()
 
-def get_time_report(year, report_id=284796):
-    """Fetch BigTime time report data for a given year."""
+def get_time_report(year, report_id=284796, raise_on_error=False):
+    """
+    Fetch BigTime time report data for a given year.
+    A year with no entries is an empty DataFrame. A failed request is an empty
+    DataFrame too, unless raise_on_error is set (then it raises).
+    """
     api_key = get_config("BIGTIME_API_KEY")
     firm_id = get_config("BIGTIME_FIRM_ID")
     
@@ -40,9 +78,10 @@ def get_time_report(year, report_id=284796):
     print(f"📡 Requesting BigTime Report {report_id} for {year}...")
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        # Streamed so an error page is never read past the snippet that gets logged
+        response = _SESSION.post(url, json=payload, headers=headers, stream=True)
         if response.status_code == 200:
-            report_data = response.json()
+            report_data = _json_loads(response.content)
             data_rows = report_data.get('Data', [])
             field_list = report_data.get('FieldList', [])
             
@@ -50,22 +89,33 @@ def get_time_report(year, report_id=284796):
                 print(f"⚠️ Report returned 0 rows for {year}")
                 return pd.DataFrame()
             
-            column_names = [field.get('FieldNm') for field in field_list]
+            # Map columns to expected names while reading the field list, so the frame
+            # is built with its final labels instead of renamed (and copied) afterwards
+            column_names = [COLUMN_MAP.get(name, name) for name in (field.get('FieldNm') for field in field_list)]
             df = pd.DataFrame(data_rows, columns=column_names)
             
-            # Map columns to expected names
-            mapping = {
-                'tmstaffnm': 'Staff Member',
-                'tmchgbillbase': 'Billable ($)',
-                'tmclientnm': 'Client'
-            }
-            df = df.rename(columns={k: v for k, v in mapping.items() if k in df.columns})
-            
             print(f"✅ BigTime Success: Found {len(df)} entries.")
             return df
         else:
-            print(f"❌ BigTime Error {response.status_code}: {response.text[:200]}")
+            snippet = next(response.iter_content(512), b'').decode('utf-8', errors='replace')
+            response.close()
+            print(f"❌ BigTime Error {response.status_code}: {snippet[:200]}")
+            if raise_on_error:
+                raise RuntimeError(f"BigTime Error {response.status_code} for {year}")
             return pd.DataFrame()
     except Exception as e:
+        if raise_on_error:
+            raise
         print(f"❌ BigTime Exception: {e}")
         return pd.DataFrame()
+
+def get_time_reports(years, report_id=284796):
+    """Fetch BigTime time reports for several years concurrently - returns {year: DataFrame}"""
+    years = list(years)
+    if len(years) <= 1:
+        return {year: get_time_report(year, report_id) for year in years}
+    
+    # Each report is a slow server-side query; overlap them on the shared session
+    with ThreadPoolExecutor(max_workers=min(len(years), REPORT_WORKERS)) as executor:
+        reports = executor.map(lambda year: get_time_report(year, report_id), years)
+        return dict(zip(years, reports))
@@ -1,9 +1,26 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import base64
 import json
 import os
 import sys
+import time
+import threading
+
+# ijson lets the P&L Detail report be walked one top-level section at a time
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Without ijson the report is parsed whole, with orjson when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Detect environment and load credentials accordingly
 try:
@@ -23,6 +40,24 @@ else:
     PROG_PATH = '/content/drive/Shareddrives/Finance and Legal/Programs/functions' if IN_COLAB else './functions'
     VAULT_PATH = os.path.join(PROG_PATH, 'token_vault.json')
 
+# Shared keep-alive session so the token refresh and report pulls (and year loops)
+# reuse one connection to Intuit. Status retries stay on the default idempotent
+# methods: a token refresh POST rotates the refresh token and must not be resent.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+
+# Access tokens last about an hour; reuse one until shortly before it expires.
+# The lock keeps concurrent callers from refreshing (and rotating the refresh token) twice.
+_TOKEN_CACHE = {"access_token": None, "expires_at": 0}
+_TOKEN_LOCK = threading.Lock()
+
 def get_config(key):
     """Get configuration value from Streamlit secrets or credentials.py"""
     if IN_STREAMLIT:
@@ -42,6 +77,10 @@ def get_vault_token():
 
 def save_vault_token(new_token):
     """Saves the newly rotated Refresh Token so the chain doesn't break."""
+    # Intuit usually hands back the same refresh token; only write when it rotated
+    if new_token == get_vault_token():
+        return
+    
     vault_data = {"QB_REFRESH_TOKEN": new_token}
     
     # Create directory if it doesn't exist (for Colab)
@@ -52,6 +91,14 @@ def save_vault_token(new_token):
     print(f"✅ Token Vault updated with new Refresh Token.")
 
 def get_access_token():
+    """Returns a valid Access Token, refreshing it with the Vaulted Refresh Token when needed."""
+    with _TOKEN_LOCK:
+        if _TOKEN_CACHE["access_token"] and time.time() < _TOKEN_CACHE["expires_at"] - 60:
+            return _TOKEN_CACHE["access_token"]
+        
+        return _refresh_access_token()
+
+def _refresh_access_token():
     """Uses the Vaulted Refresh Token to get a new temporary Access Token."""
     url = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
     
@@ -76,7 +123,7 @@ def get_access_token():
     }
     
     print(f"📡 Attempting to refresh QB token for Client ID: {client_id[:5]}...")
-    response = requests.post(url, data=payload, headers=headers)
+    response = _SESSION.post(url, data=payload, headers=headers)
     
     if response.status_code == 200:
         data = response.json()
@@ -85,6 +132,9 @@ def get_access_token():
         new_refresh_token = data.get('refresh_token')
         if new_refresh_token:
             save_vault_token(new_refresh_token)
+        
+        _TOKEN_CACHE["access_token"] = data['access_token']
+        _TOKEN_CACHE["expires_at"] = time.time() + data.get('expires_in', 3600)
             
         return data['access_token']
     else:
@@ -116,10 +166,15 @@ def get_consulting_income(year):
     msg = f"📡 Pulling P&L Detail Report (Cash Basis) for {year}..."
     print(msg)  # Only print to logs, not Streamlit UI
     
-    response = requests.get(url, headers=headers, params=params)
+    response = _SESSION.get(url, headers=headers, params=params, stream=ijson is not None)
     
     if response.status_code == 200:
-        report_data = response.json()
+        if ijson is not None:
+            # Stream the top-level sections (Income, Expenses, ...) so only one is held at a time
+            response.raw.decode_content = True
+            sections = ijson.items(response.raw, 'Rows.Row.item', use_float=True)
+        else:
+            sections = _json_loads(response.content).get('Rows', {}).get('Row', [])
         
         # DEBUG: Show all account names in the report (only in logs)
         def extract_account_names(rows, depth=0):
@@ -137,8 +192,29 @@ def get_consulting_income(year):
                     names.extend(extract_account_names(row['Rows']['Row'], depth + 1))
             return names
         
-        rows = report_data.get('Rows', {}).get('Row', [])
-        all_accounts = extract_account_names(rows)
+        def find_consulting_income(rows):
+            # Depth-first in report order with an explicit stack (children pushed reversed)
+            stack = rows[::-1]
+            while stack:
+                row = stack.pop()
+                header = row.get('Header')
+                if header:
+                    col_data = header.get('ColData')
+                    if col_data and 'Consulting Income' in col_data[0].get('value', ''):
+                        return row
+                
+                sub_rows = row.get('Rows', {}).get('Row')
+                if sub_rows:
+                    stack.extend(sub_rows[::-1])
+            return None
+        
+        all_accounts = []
+        consulting_section = None
+        for section in sections:
+            all_accounts.extend(extract_account_names([section]))
+            if consulting_section is None:
+                consulting_section = find_consulting_income([section])
+        response.close()
         
         # Only print to logs (not Streamlit UI)
         print("📋 Available accounts in P&L report:")
@@ -147,47 +223,37 @@ def get_consulting_income(year):
         if len(all_accounts) > 30:
             print(f"   ... and {len(all_accounts) - 30} more")
         
-        def find_consulting_income(rows):
-            for row in rows:
-                if 'Header' in row:
-                    col_data = row['Header'].get('ColData', [])
-                    if col_data and 'Consulting Income' in col_data[0].get('value', ''):
-                        return row
-                
-                if 'Rows' in row and 'Row' in row['Rows']:
-                    result = find_consulting_income(row['Rows']['Row'])
-                    if result:
-                        return result
-            return None
-        
-        consulting_section = find_consulting_income(rows)
-        
         if not consulting_section:
             msg = "⚠️  Could not find 'Consulting Income' account in report"
             print(f"   {msg}")
             return pd.DataFrame()
         
         detail_rows = consulting_section.get('Rows', {}).get('Row', [])
-        transactions = []
-        for row in detail_rows:
-            if row.get('type') == 'Data':
-                cols = row.get('ColData', [])
-                if len(cols) >= 7:
-                    transactions.append({
-                        'TransactionDate': cols[0].get('value', ''),
-                        'TransactionType': cols[1].get('value', ''),
-                        'TransactionNumber': cols[2].get('value', ''),
-                        'Customer': cols[3].get('value', ''),
-                        'Memo': cols[4].get('value', ''),
-                        'Split': cols[5].get('value', ''),
-                        'Amount': cols[6].get('value', '0'),
-                        'Balance': cols[7].get('value', '0') if len(cols) > 7 else '0'
-                    })
+        data_cols = [
+            cols for cols in (row.get('ColData', []) for row in detail_rows if row.get('type') == 'Data')
+            if len(cols) >= 7
+        ]
         
-        if transactions:
-            df = pd.DataFrame(transactions)
-            df['TotalAmount'] = pd.to_numeric(df['Amount'], errors='coerce')
-            df['TransactionDate'] = pd.to_datetime(df['TransactionDate'])
+        if data_cols:
+            def column(index, default=''):
+                """One report column as a list (Balance, index 7, can be missing)"""
+                return [cols[index].get('value', default) if len(cols) > index else default for cols in data_cols]
+            
+            # Assemble column-wise so pandas doesn't infer and transpose a list of row dicts.
+            # Type/customer/split repeat across thousands of rows, so they are stored as categories;
+            # amounts stay float64 so totals are exact to the cent.
+            amounts = column(6, '0')
+            df = pd.DataFrame({
+                'TransactionDate': pd.to_datetime(column(0)),
+                'TransactionType': pd.Categorical(column(1)),
+                'TransactionNumber': column(2),
+                'Customer': pd.Categorical(column(3)),
+                'Memo': column(4),
+                'Split': pd.Categorical(column(5)),
+                'Amount': amounts,
+                'Balance': column(7, '0'),
+                'TotalAmount': pd.to_numeric(amounts, errors='coerce')
+            })
             total = df['TotalAmount'].sum()
             
             msg = f"✅ QuickBooks: Found {len(df)} consulting income transactions (Total: ${total:,.2f})"
@@ -198,6 +264,7 @@ def get_consulting_income(year):
             print(f"   {msg}")
             return pd.DataFrame()
     
+    response.close()
     msg = f"❌ QB Report Error: {response.status_code}"
     print(msg)
     return pd.DataFrame()
@@ -1,9 +1,7 @@
 import os
 import sys
+from functools import lru_cache
 import pandas as pd
-import gspread
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 
 # Detect environment and load credentials accordingly
 try:
@@ -94,13 +92,19 @@ def get_config(key):
     else:
         return credentials.get(key)
 
+@lru_cache(maxsize=1)
 def get_client():
     """
     Universal Authentication for Google Sheets:
     - Works in Streamlit (uses secrets)
     - Works in Colab (uses service account file)
     - Works locally (uses service account file)
+    Authorized once per process; the credentials refresh their own access token.
     """
+    # Google client libraries load on first use; Snowflake-mode reads never need them
+    import gspread
+    from google.oauth2 import service_account
+    
     SCOPES = [
         'https://www.googleapis.com/auth/spreadsheets',
         'https://www.googleapis.com/auth/drive'
@@ -135,8 +139,11 @@ def get_client():
     
     return gspread.authorize(creds)
 
+@lru_cache(maxsize=1)
 def get_drive_client():
-    """Returns a Google Drive API client using the same credentials."""
+    """Returns a Google Drive API client using the same credentials (built once per process)."""
+    from googleapiclient.discovery import build
+    
     gc = get_client()
     return build('drive', 'v3', credentials=gc.auth)
 
@@ -170,20 +177,31 @@ def create_report_spreadsheet(report_name):
     Returns the gspread Spreadsheet object.
     """
     gc = get_client()
-    sh = gc.create(report_name)
     
-    # Move to reports folder
+    # Create it directly in the reports folder (no separate Drive get + update to move it)
     reports_folder_id = get_config("REPORTS_FOLDER_ID")
-    move_file_to_folder(file_id=sh.id, folder_id=reports_folder_id)
+    sh = gc.create(report_name, folder_id=reports_folder_id)
     
     print(f"✅ Report created in reports folder: {sh.url}")
     return sh
 
+def _cell_data(value):
+    """Sheets API CellData for one value, entered RAW like worksheet.update does."""
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
 def write_report(df, spreadsheet_id, sheet_name):
     """
     Writes a DataFrame to a worksheet.
     Creates the tab if missing, clears old data, and pushes new data.
     """
+    import gspread
+    
     gc = get_client()
     try:
         sh = gc.open_by_key(spreadsheet_id)
@@ -197,13 +215,34 @@ def write_report(df, spreadsheet_id, sheet_name):
                 cols=20
             )
         
-        worksheet.clear()
-        
-        # Prepare data
-        df_clean = df.fillna("")
-        data_to_push = [df_clean.columns.values.tolist()] + df_clean.values.tolist()
+        # Prepare data (one object conversion with blanks for missing values, no fillna copy)
+        header = df.columns.tolist()
+        body = df.to_numpy(dtype=object, na_value="").tolist()
+        values = [header] + body
         
-        worksheet.update(values=data_to_push, range_name='A1')
+        # Clear and write in one batchUpdate: updateCells over the whole sheet blanks
+        # every cell not covered by the new rows, so no separate clear round-trip
+        requests_ = []
+        row_count = max(worksheet.row_count, len(values))
+        col_count = max(worksheet.col_count, len(header))
+        if (row_count, col_count) != (worksheet.row_count, worksheet.col_count):
+            requests_.append({
+                'updateSheetProperties': {
+                    'properties': {
+                        'sheetId': worksheet.id,
+                        'gridProperties': {'rowCount': row_count, 'columnCount': col_count}
+                    },
+                    'fields': 'gridProperties(rowCount,columnCount)'
+                }
+            })
+        requests_.append({
+            'updateCells': {
+                'range': {'sheetId': worksheet.id},
+                'rows': [{'values': [_cell_data(value) for value in row]} for row in values],
+                'fields': 'userEnteredValue'
+            }
+        })
+        sh.batch_update({'requests': requests_})
         
         print(f"✅ Data successfully pushed to sheet: {sheet_name}")
     except Exception as e:
@@ -268,69 +307,50 @@ def _pivot_assignments_from_snowflake():
     Excel format that apps like Project Health Monitor expect.
     """
     from functions.snowflake_db import query_snowflake
-    from datetime import datetime
-    from dateutil.relativedelta import relativedelta
 
+    # Pivot server-side: one row per project/staff line with a column per month (zero-filled),
+    # so only the wide result crosses the wire. NULL bill rates/notes are normalized first so
+    # they group like the rest; lines missing a project field are skipped, as pivot_table did.
     query = """
-    SELECT
-        a.PROJECT_ID,
-        p.CLIENT_NAME,
-        p.PROJECT_NAME,
-        p.PROJECT_STATUS,
-        a.STAFF_NAME,
-        a.BILL_RATE,
-        a.NOTES,
-        a.MONTH_DATE,
-        a.ALLOCATED_HOURS
-    FROM VC_STAFF_ASSIGNMENTS a
-    JOIN VC_PROJECTS p ON a.PROJECT_ID = p.PROJECT_ID
-    ORDER BY a.PROJECT_ID, a.STAFF_NAME, a.MONTH_DATE
+    SELECT *
+    FROM (
+        SELECT
+            a.PROJECT_ID,
+            p.CLIENT_NAME,
+            p.PROJECT_NAME,
+            p.PROJECT_STATUS,
+            a.STAFF_NAME,
+            COALESCE(a.BILL_RATE, 0) AS BILL_RATE,
+            COALESCE(a.NOTES, '') AS NOTES,
+            a.MONTH_DATE,
+            COALESCE(a.ALLOCATED_HOURS, 0) AS ALLOCATED_HOURS
+        FROM VC_STAFF_ASSIGNMENTS a
+        JOIN VC_PROJECTS p ON a.PROJECT_ID = p.PROJECT_ID
+        WHERE p.CLIENT_NAME IS NOT NULL
+          AND p.PROJECT_NAME IS NOT NULL
+          AND p.PROJECT_STATUS IS NOT NULL
+          AND a.STAFF_NAME IS NOT NULL
+    )
+    PIVOT (SUM(ALLOCATED_HOURS) FOR MONTH_DATE IN (ANY ORDER BY MONTH_DATE) DEFAULT ON NULL (0))
+    ORDER BY PROJECT_ID, CLIENT_NAME, PROJECT_NAME, PROJECT_STATUS, STAFF_NAME, BILL_RATE, NOTES
     """
 
-    df = query_snowflake(query)
-
-    if df.empty:
-        return df
+    pivot_df = query_snowflake(query)
 
-    # Convert Decimal types to numeric (Snowflake returns Decimal objects)
-    df['ALLOCATED_HOURS'] = pd.to_numeric(df['ALLOCATED_HOURS'], errors='coerce').fillna(0)
-    df['BILL_RATE'] = pd.to_numeric(df['BILL_RATE'], errors='coerce').fillna(0)
+    if pivot_df.empty:
+        return pivot_df
 
-    # Handle None in NOTES - convert to empty string for consistent grouping
-    df['NOTES'] = df['NOTES'].fillna('')
-
-    # Get the static columns (everything except month_date and allocated_hours)
+    # The static columns (every other column is a month)
     static_cols = ['PROJECT_ID', 'CLIENT_NAME', 'PROJECT_NAME', 'PROJECT_STATUS',
                    'STAFF_NAME', 'BILL_RATE', 'NOTES']
 
-    # Create pivot table
-    pivot_df = df.pivot_table(
-        index=static_cols,
-        columns='MONTH_DATE',
-        values='ALLOCATED_HOURS',
-        aggfunc='sum',
-        fill_value=0
-    ).reset_index()
-
-    # Convert date columns to end-of-month datetime objects (matching original Excel format)
-    new_columns = []
-    date_columns = []
-    for col in pivot_df.columns:
-        if col in static_cols:
-            new_columns.append(col)
-        else:
-            try:
-                # Convert to datetime (first of month from Snowflake)
-                date_val = pd.to_datetime(col)
-                # Convert to end-of-month datetime to match original Excel format
-                end_of_month = date_val + relativedelta(months=1) - relativedelta(days=1)
-                new_columns.append(end_of_month)
-                date_columns.append(end_of_month)
-            except Exception:
-                new_columns.append(col)
-    pivot_df.columns = new_columns
-
-    # Rename to match Google Sheets format
+    # Month columns become end-of-month datetimes (matching original Excel format), converted
+    # in one pass. PIVOT labels them as quoted first-of-month dates, e.g. '2024-01-01'.
+    month_cols = [col for col in pivot_df.columns if col not in static_cols]
+    month_starts = pd.to_datetime([str(col).strip("'") for col in month_cols])
+    date_columns = list(month_starts + pd.DateOffset(months=1) - pd.DateOffset(days=1))
+
+    # Rename to match Google Sheets format (static and month columns in one rename)
     rename_map = {
         'PROJECT_ID': 'Project ID',
         'CLIENT_NAME': 'Client',
@@ -340,6 +360,7 @@ def _pivot_assignments_from_snowflake():
         'BILL_RATE': 'Bill Rate',
         'NOTES': 'Notes',
     }
+    rename_map.update(zip(month_cols, date_columns))
     pivot_df = pivot_df.rename(columns=rename_map)
 
     # Calculate Total column (sum of all date columns)
@@ -360,66 +381,50 @@ def _pivot_fixedfee_from_snowflake():
     Excel format that apps expect.
     """
     from functions.snowflake_db import query_snowflake
-    from dateutil.relativedelta import relativedelta
 
+    # Pivot server-side: one row per project with a column per month (zero-filled)
     query = """
-    SELECT
-        f.PROJECT_ID,
-        p.CLIENT_NAME,
-        p.PROJECT_NAME,
-        p.PROJECT_STATUS,
-        f.MONTH_DATE,
-        f.REVENUE_AMOUNT
-    FROM VC_FIXED_FEE_REVENUE f
-    JOIN VC_PROJECTS p ON f.PROJECT_ID = p.PROJECT_ID
-    ORDER BY f.PROJECT_ID, f.MONTH_DATE
+    SELECT *
+    FROM (
+        SELECT
+            f.PROJECT_ID,
+            p.CLIENT_NAME,
+            p.PROJECT_NAME,
+            p.PROJECT_STATUS,
+            f.MONTH_DATE,
+            COALESCE(f.REVENUE_AMOUNT, 0) AS REVENUE_AMOUNT
+        FROM VC_FIXED_FEE_REVENUE f
+        JOIN VC_PROJECTS p ON f.PROJECT_ID = p.PROJECT_ID
+        WHERE p.CLIENT_NAME IS NOT NULL
+          AND p.PROJECT_NAME IS NOT NULL
+          AND p.PROJECT_STATUS IS NOT NULL
+    )
+    PIVOT (SUM(REVENUE_AMOUNT) FOR MONTH_DATE IN (ANY ORDER BY MONTH_DATE) DEFAULT ON NULL (0))
+    ORDER BY PROJECT_ID, CLIENT_NAME, PROJECT_NAME, PROJECT_STATUS
     """
 
-    df = query_snowflake(query)
+    pivot_df = query_snowflake(query)
 
-    if df.empty:
-        return df
+    if pivot_df.empty:
+        return pivot_df
 
-    # Convert Decimal types to numeric (Snowflake returns Decimal objects)
-    df['REVENUE_AMOUNT'] = pd.to_numeric(df['REVENUE_AMOUNT'], errors='coerce').fillna(0)
-
-    # Get the static columns
+    # The static columns (every other column is a month)
     static_cols = ['PROJECT_ID', 'CLIENT_NAME', 'PROJECT_NAME', 'PROJECT_STATUS']
 
-    # Create pivot table
-    pivot_df = df.pivot_table(
-        index=static_cols,
-        columns='MONTH_DATE',
-        values='REVENUE_AMOUNT',
-        aggfunc='sum',
-        fill_value=0
-    ).reset_index()
-
-    # Convert date columns to end-of-month datetime objects (matching original Excel format)
-    new_columns = []
-    date_columns = []
-    for col in pivot_df.columns:
-        if col in static_cols:
-            new_columns.append(col)
-        else:
-            try:
-                # Convert to datetime (first of month from Snowflake)
-                date_val = pd.to_datetime(col)
-                # Convert to end-of-month datetime to match original Excel format
-                end_of_month = date_val + relativedelta(months=1) - relativedelta(days=1)
-                new_columns.append(end_of_month)
-                date_columns.append(end_of_month)
-            except Exception:
-                new_columns.append(col)
-    pivot_df.columns = new_columns
-
-    # Rename to match Google Sheets format
+    # Month columns become end-of-month datetimes (matching original Excel format), converted
+    # in one pass. PIVOT labels them as quoted first-of-month dates, e.g. '2024-01-01'.
+    month_cols = [col for col in pivot_df.columns if col not in static_cols]
+    month_starts = pd.to_datetime([str(col).strip("'") for col in month_cols])
+    date_columns = list(month_starts + pd.DateOffset(months=1) - pd.DateOffset(days=1))
+
+    # Rename to match Google Sheets format (static and month columns in one rename)
     rename_map = {
         'PROJECT_ID': 'Project ID',
         'CLIENT_NAME': 'Client',
         'PROJECT_NAME': 'Project Name',
         'PROJECT_STATUS': 'Project Status',
     }
+    rename_map.update(zip(month_cols, date_columns))
     pivot_df = pivot_df.rename(columns=rename_map)
 
     # Calculate Total column (sum of all date columns)
@@ -465,6 +470,51 @@ def read_config_from_snowflake(sheet_name):
 # Original Google Sheets Functions (updated for dual mode)
 # =============================================================================
 
+# Config tabs change rarely; cache reads across Streamlit reruns and sessions for this long
+CONFIG_CACHE_TTL = 300
+
+
+def _read_config(spreadsheet_id, sheet_name, use_snowflake):
+    """
+    Reads a configuration tab from exactly the requested source (Snowflake or Google Sheets).
+    Raises on any failure, so only a successful read from that source is ever cached.
+    """
+    if use_snowflake:
+        return read_config_from_snowflake(sheet_name)
+
+    # Original Google Sheets logic
+    import gspread
+    
+    gc = get_client()
+    try:
+        sh = gc.open_by_key(spreadsheet_id)
+        worksheet = sh.worksheet(sheet_name)
+        # Raw 2-D values straight into pandas (no dict per row). Numbers come back unformatted;
+        # dates stay as their displayed strings so callers parse them as before.
+        raw = worksheet.get_values(
+            value_render_option='UNFORMATTED_VALUE',
+            date_time_render_option='FORMATTED_STRING'
+        )
+        if not raw:
+            return pd.DataFrame()
+        return pd.DataFrame(raw[1:], columns=raw[0])
+    except gspread.exceptions.SpreadsheetNotFound:
+        raise RuntimeError(
+            f"❌ Error: Cannot access spreadsheet {spreadsheet_id}. "
+            f"Make sure it's shared with the service account."
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ Error reading sheet '{sheet_name}': {e}")
+
+
+# Under Streamlit, identical reads within the TTL are served from st.cache_data
+# (each caller gets its own copy of the frame); scripts always read fresh
+if IN_STREAMLIT:
+    _read_config_cached = st.cache_data(ttl=CONFIG_CACHE_TTL, show_spinner=False)(_read_config)
+else:
+    _read_config_cached = _read_config
+
+
 def read_config(spreadsheet_id, sheet_name, use_snowflake=None):
     """
     Reads a configuration tab into a DataFrame.
@@ -473,6 +523,10 @@ def read_config(spreadsheet_id, sheet_name, use_snowflake=None):
     - When use_snowflake=True (or st.secrets['use_snowflake']=True), reads from Snowflake
     - Otherwise, reads from Google Sheets (default)
 
+    In Streamlit, results are cached for CONFIG_CACHE_TTL seconds per
+    (spreadsheet_id, sheet_name, source); failed reads are not cached, and a
+    Snowflake failure falls back to a Sheets read cached under the Sheets key.
+
     Args:
         spreadsheet_id: Google Sheets spreadsheet ID (ignored when using Snowflake)
         sheet_name: Name of the sheet/tab to read
@@ -487,26 +541,15 @@ def read_config(spreadsheet_id, sheet_name, use_snowflake=None):
 
     if use_snowflake:
         try:
-            return read_config_from_snowflake(sheet_name)
+            return _read_config_cached(spreadsheet_id, sheet_name, True)
         except Exception as e:
             print(f"⚠️ Snowflake read failed for '{sheet_name}', falling back to Google Sheets: {e}")
-            # Fall through to Google Sheets
+            # Fall through to Google Sheets (cached under its own key)
 
-    # Original Google Sheets logic
-    gc = get_client()
     try:
-        sh = gc.open_by_key(spreadsheet_id)
-        worksheet = sh.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        return pd.DataFrame(data)
-    except gspread.exceptions.SpreadsheetNotFound:
-        print(
-            f"❌ Error: Cannot access spreadsheet {spreadsheet_id}. "
-            f"Make sure it's shared with the service account."
-        )
-        return None
-    except Exception as e:
-        print(f"❌ Error reading sheet '{sheet_name}': {e}")
+        return _read_config_cached(spreadsheet_id, sheet_name, False)
+    except RuntimeError as e:
+        print(e)
         return None
 
 
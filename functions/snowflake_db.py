@@ -8,6 +8,8 @@ Supports two modes:
 """
 
 import os
+import atexit
+import threading
 import pandas as pd
 import snowflake.connector
 
@@ -18,6 +20,14 @@ try:
 except ImportError:
     IN_STREAMLIT = False
 
+# One long-lived connection per process, shared by every query (a connect handshake
+# takes about a second). Queries each open their own cursor, which is thread-safe.
+_CONNECTION = None
+_CONNECTION_LOCK = threading.Lock()
+
+# Session expired / gone / auth token expired: reconnect once and retry the query
+_RECONNECT_ERRNOS = {390111, 390112, 390114}
+
 
 def get_snowflake_connection():
     """
@@ -89,34 +99,90 @@ def get_snowflake_connection():
     )
 
 
-def query_snowflake(query, params=None):
+def get_shared_connection(stale=None):
     """
-    Execute a query and return results as a DataFrame.
+    Return the process-wide Snowflake connection, opening it on first use (or when closed).
 
-    Args:
-        query: SQL query string
-        params: Optional parameters for parameterized queries
-
-    Returns:
-        pandas.DataFrame with query results
+    Pass the connection a query just failed on as `stale` to replace it
+    (unless another thread already has).
     """
-    conn = get_snowflake_connection()
-    try:
-        cursor = conn.cursor()
+    global _CONNECTION
+    with _CONNECTION_LOCK:
+        if stale is not None and _CONNECTION is stale:
+            _close_connection_locked()
+        if _CONNECTION is None or _CONNECTION.is_closed():
+            _CONNECTION = get_snowflake_connection()
+        return _CONNECTION
+
+
+def _close_connection_locked():
+    """Close the shared connection; caller holds _CONNECTION_LOCK."""
+    global _CONNECTION
+    if _CONNECTION is not None:
+        try:
+            _CONNECTION.close()
+        except Exception:
+            pass
+        _CONNECTION = None
+
+
+@atexit.register
+def close_shared_connection():
+    """Close the shared connection (runs at interpreter exit)."""
+    with _CONNECTION_LOCK:
+        _close_connection_locked()
+
+
+def _run_query(conn, query, params):
+    """Execute a query on its own cursor and return the results as a DataFrame."""
+    with conn.cursor() as cursor:
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
 
+        # Statements without a result set (DDL/DML)
+        if cursor.description is None:
+            return pd.DataFrame()
+
         # Get column names
         columns = [desc[0] for desc in cursor.description]
 
-        # Fetch all rows
-        rows = cursor.fetchall()
+        # Arrow-backed fetch: typed columns (NUMBER -> int64/float64, TIMESTAMP -> datetime64)
+        # instead of boxing every cell into Python objects
+        try:
+            df = cursor.fetch_pandas_all()
+        except snowflake.connector.errors.NotSupportedError:
+            # Result not in Arrow format (e.g. SHOW/DESCRIBE); fetch rows the plain way
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+        # Older connectors return a frame without columns for an empty result
+        if df.empty and len(df.columns) == 0:
+            return pd.DataFrame(columns=columns)
+        return df
+
+
+def query_snowflake(query, params=None):
+    """
+    Execute a query and return results as a DataFrame.
+
+    Runs on the shared connection; the connection is kept open for the next query.
 
-        return pd.DataFrame(rows, columns=columns)
-    finally:
-        conn.close()
+    Args:
+        query: SQL query string
+        params: Optional parameters for parameterized queries
+
+    Returns:
+        pandas.DataFrame with query results
+    """
+    conn = get_shared_connection()
+    try:
+        return _run_query(conn, query, params)
+    except snowflake.connector.errors.Error as e:
+        if e.errno not in _RECONNECT_ERRNOS:
+            raise
+        # The idle session expired server-side; open a fresh connection and retry once
+        return _run_query(get_shared_connection(stale=conn), query, params)
 
 
 def read_table(table_name):
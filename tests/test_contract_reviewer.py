@@ -0,0 +1,36 @@
+"""Tests for the Contract Reviewer page's contract splitting."""
+
+import ast
+from pathlib import Path
+
+PAGE = Path(__file__).resolve().parent.parent / "archived" / "pages" / "17_📝_Contract_Reviewer.py"
+
+
+def _load_split_contract():
+    """Pull _split_contract out of the page without running its Streamlit code."""
+    tree = ast.parse(PAGE.read_text(encoding="utf-8"))
+    func = next(node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == "_split_contract")
+    namespace = {}
+    exec(compile(ast.Module(body=[func], type_ignores=[]), str(PAGE), "exec"), namespace)
+    return namespace["_split_contract"]
+
+
+_split_contract = _load_split_contract()
+
+
+def test_oversize_paragraph_keeps_contract_order():
+    text = "a" * 10 + "\n\n" + "b" * 25 + "\n\n" + "c" * 5
+    assert _split_contract(text, 12) == ["a" * 10, "b" * 12, "b" * 12, "b\n\n" + "c" * 5]
+
+
+def test_oversize_paragraph_cut_between_words():
+    text = "intro\n\nthe quick brown fox jumps over the lazy dog\n\nend"
+    parts = _split_contract(text, 16)
+    assert parts[0] == "intro"
+    assert all(len(part) <= 16 for part in parts)
+    # Every word survives whole, in order
+    assert " ".join(" ".join(parts).split()) == " ".join(text.split())
+
+
+def test_short_contract_is_one_part():
+    assert _split_contract("one\n\ntwo", 100) == ["one\n\ntwo"]